@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+import pygame
+
+# Сколько масштабированных вариантов изображений держать в памяти
+MAX_SCALED = 8
+# Заливка вместо изображения, которое не удалось загрузить
+FALLBACK_COLOR = (255, 255, 255)
+
+
+class Assets:
+    """Изображения игры, декодированные один раз на процесс
+
+    Файл загружается при первом обращении и переводится в формат экрана
+    (convert), как только появляется окно, - после этого blit не тратит
+    время на преобразование пикселей. Варианты под размеры окон хранятся
+    в LRU на MAX_SCALED штук, поэтому смена экрана или рестарт партии не
+    декодирует и не масштабирует изображение заново. Выданные поверхности
+    общие, рисовать на них нельзя.
+    """
+
+    def __init__(self, max_scaled: int = MAX_SCALED):
+        self.max_scaled = max_scaled
+        self.images = {}  # путь -> исходная поверхность или None, если файл не загрузился
+        self.converted = set()  # пути, уже переведенные в формат экрана
+        self.variants = OrderedDict()  # (путь, размер) -> поверхность, от давних к недавним
+
+    def image(self, path: str):
+        """Исходное изображение или None"""
+        if path not in self.images:
+            try:
+                self.images[path] = pygame.image.load(path)
+            except (pygame.error, OSError):
+                self.images[path] = None
+        image = self.images[path]
+        if image is not None and path not in self.converted and pygame.display.get_surface() is not None:
+            image = self.images[path] = image.convert()
+            self.converted.add(path)
+        return image
+
+    def scaled(self, path: str, size: tuple) -> pygame.Surface:
+        """Изображение, растянутое до size; без файла - белая заливка того же размера"""
+        size = (int(size[0]), int(size[1]))
+        key = (path, size)
+        surface = self.variants.get(key)
+        if surface is not None:
+            self.variants.move_to_end(key)
+            return surface
+
+        image = self.image(path)
+        if image is None:
+            surface = pygame.Surface(size)
+            surface.fill(FALLBACK_COLOR)
+        elif image.get_size() == size:
+            surface = image
+        else:
+            surface = pygame.transform.scale(image, size)
+        # Вариант, собранный до появления окна, не кэшируется: он еще не в формате экрана
+        if path in self.converted or image is None:
+            self.variants[key] = surface
+            while len(self.variants) > self.max_scaled:
+                self.variants.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.images.clear()
+        self.converted.clear()
+        self.variants.clear()
+
+
+_assets = None
+
+
+def get_assets() -> Assets:
+    """Общий набор изображений на все экраны процесса"""
+    global _assets
+    if _assets is None:
+        _assets = Assets()
+    return _assets
@@ -0,0 +1,233 @@
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from BitBoard import BitBoard
+from GameEngine import candidate_board
+from Board import Board, NEIGHBOURS, OPENED
+from GlobalConstants import LEVELS
+from Startup import FIRST_FRAME_MARK, STARTUP_BENCH_ENV
+
+# Большое пользовательское поле для сравнения
+LARGE_BOARD = {"name": "500x500", "width": 500, "height": 500, "mines": 50000}
+# Редкое поле с большими пустыми областями для замера каскада
+SPARSE_BOARD = {"name": "500x500", "width": 500, "height": 500, "mines": 5000}
+# Сколько полей каждого уровня сверять после переноса мин из зоны первого хода
+CLEAR_ZONE_BOARDS = 200
+# Допустимое время от запуска процесса до первого кадра меню, мс
+STARTUP_BUDGET_MS = 1500
+
+
+class Cell:
+    """Клетка прежнего поля GameLogic.FIELD"""
+
+    def __init__(self):
+        self.mine = False
+        self.opened = False
+        self.flag = False
+        self.nearbyMines = 0
+
+
+class CellField:
+    """Прежнее поле из объектов Cell - точка отсчета для сравнения
+
+    Открытие пустой области повторяет старый open_empty_cells, только
+    рекурсия заменена стеком, чтобы большие поля не упирались в ее предел.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.reset()
+
+    def reset(self):
+        self.field = [[Cell() for _ in range(self.height + 2)] for _ in range(self.width + 2)]
+
+    def load(self, board: Board):
+        for i in range(1, self.width + 1):
+            for j in range(1, self.height + 1):
+                self.field[i][j].mine = board.is_mine(i, j)
+                self.field[i][j].nearbyMines = board.nearby_mines(i, j)
+
+    def reveal(self, i: int, j: int) -> list:
+        field = self.field
+        field[i][j].opened = True
+        opened = [(i, j)]
+        if field[i][j].nearbyMines:
+            return opened
+        stack = [(i, j)]
+        while stack:
+            ci, cj = stack.pop()
+            for di, dj in NEIGHBOURS:
+                ni, nj = ci + di, cj + dj
+                if 1 <= ni <= self.width and 1 <= nj <= self.height:
+                    cell = field[ni][nj]
+                    if not cell.opened and not cell.flag:
+                        cell.opened = True
+                        opened.append((ni, nj))
+                        if cell.nearbyMines == 0:
+                            stack.append((ni, nj))
+        return opened
+
+    def close_all(self):
+        for column in self.field:
+            for cell in column:
+                cell.opened = False
+
+
+def make_board(width: int, height: int, mines: int, seed: int = 0) -> Board:
+    """Поле со случайно расставленными минами"""
+    board = Board(width, height)
+    rng = random.Random(seed)
+    for index in rng.sample(range(width * height), mines):
+        board.set_mine(index // height + 1, index % height + 1)
+    return board
+
+
+def best_time(func, number: int) -> float:
+    """Лучшее время одного вызова в миллисекундах"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1000
+
+
+def bench_setup_field():
+    """Подсчет мин вокруг клеток: чистый Python против NumPy"""
+    print("setup_field: подсчет мин вокруг клеток")
+    print(f"{'Поле':>12} {'Python, мс':>12} {'NumPy, мс':>12} {'Ускорение':>10}")
+
+    for level in list(LEVELS.values()) + [LARGE_BOARD]:
+        board = make_board(level["width"], level["height"], level["mines"])
+        number = 1 if level is LARGE_BOARD else 100
+
+        python_ms = best_time(lambda: board.compute_nearby(vectorized=False), number)
+        python_counts = board.nearby.copy()
+        numpy_ms = best_time(lambda: board.compute_nearby(), number * 10)
+        assert (python_counts == board.nearby).all()
+
+        print(f"{level['name']:>12} {python_ms:>12.3f} {numpy_ms:>12.3f} {python_ms / numpy_ms:>9.1f}x")
+
+
+def timed(run, prepare, repeat: int = 5) -> float:
+    """Лучшее время run() в миллисекундах, prepare() перед каждым запуском не считается"""
+    best = float("inf")
+    for _ in range(repeat):
+        prepare()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def close_board(board: Board):
+    board.state &= ~OPENED & 0xFF
+    board.opened_count = 0
+
+
+def close_bitboard(board: BitBoard):
+    board.opened = 0
+    board.opened_count = 0
+
+
+def bench_bitboard():
+    """Объекты Cell против Board на NumPy и BitBoard на длинных целых"""
+    print("\nBitBoard: открытие клеток, каскад и сброс поля, мс")
+    print(f"{'Поле':>12} {'Операция':>10} {'Cell':>10} {'Board':>10} {'BitBoard':>10}")
+
+    for level in list(LEVELS.values()) + [LARGE_BOARD, SPARSE_BOARD]:
+        width, height, mines = level["width"], level["height"], level["mines"]
+        board = make_board(width, height, mines)
+        board.compute_nearby()
+        board.build_regions()
+        bits = BitBoard(width, height)
+        for i, j in board.mine_positions():
+            bits.set_mine(i, j)
+        bits.compute_nearby()
+        cells = CellField(width, height)
+        cells.load(board)
+
+        fields = [(cells, cells.close_all), (board, lambda: close_board(board)),
+                  (bits, lambda: close_bitboard(bits))]
+        all_cells = [(i, j) for i in range(1, width + 1) for j in range(1, height + 1)]
+        numbers = [cell for cell in all_cells if board.nearby_mines(*cell) and not board.is_mine(*cell)]
+        random.Random(0).shuffle(numbers)
+        numbers = numbers[:200]
+        # Каскад - клик в самую большую пустую область
+        sizes = np.bincount(board.region_labels.ravel())
+        largest = int(sizes[1:].argmax()) + 1 if len(sizes) > 1 else 0
+        start = tuple(int(x) for x in np.argwhere(board.region_labels == largest)[0]) if largest else None
+
+        rows = {"клик": [], "каскад": [], "сброс": []}
+        opened = set()
+        for field, close in fields:
+            rows["клик"].append(timed(lambda: [field.reveal(i, j) for i, j in numbers], close) / max(1, len(numbers)))
+            if start is not None:
+                rows["каскад"].append(timed(lambda: field.reveal(*start), close))
+                close()
+                opened.add(len(field.reveal(*start)))
+            rows["сброс"].append(timed(field.reset, lambda: None))
+        assert len(opened) <= 1, "поля открыли разные области"
+
+        name = f"{level['name']}/{mines}"
+        for operation, values in rows.items():
+            if values:
+                print(f"{name:>12} {operation:>10} " + " ".join(f"{value:>10.4f}" for value in values))
+
+
+def check_clear_zone(boards: int = CLEAR_ZONE_BOARDS):
+    """Поле после переноса мин из зоны первого хода против размеченного с нуля"""
+    print(f"\nclear_zone: сверка числа областей на {boards} полях каждого уровня")
+    for level in list(LEVELS.values()) + [{"name": "30x16 плотное", "width": 30, "height": 16, "mines": 170}]:
+        width, height, mines = level["width"], level["height"], level["mines"]
+        rng = random.Random(level["name"])
+        for seed in range(1, boards + 1):
+            board = candidate_board(width, height, mines, seed)
+            i, j = rng.randint(1, width), rng.randint(1, height)
+            board.clear_zone(board.safe_zone(i, j, mines), random.Random(seed))
+            patched = board.openings()
+            board.build_regions()
+            assert patched == board.openings(), f"{level['name']}, зерно {seed}: области не пересчитаны"
+        print(f"{level['name']:>16} ok")
+
+
+def spawn_time(args: list, env: dict) -> float:
+    """Время в мс от запуска процесса до его отметки первого кадра (или до выхода)"""
+    start = time.time()
+    process = subprocess.Popen([sys.executable] + args, env=env, stdout=subprocess.PIPE, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    output, _ = process.communicate()
+    for line in output.splitlines():
+        if line.startswith(FIRST_FRAME_MARK):
+            return (float(line.split()[1]) - start) * 1000
+    if process.returncode:
+        raise RuntimeError(f"процесс завершился с кодом {process.returncode}")
+    return (time.time() - start) * 1000
+
+
+def bench_startup(runs: int = 5) -> bool:
+    """Время до первого кадра меню от запуска процесса; False - бюджет превышен"""
+    env = dict(os.environ, **{STARTUP_BENCH_ENV: "1"})
+    interpreter = statistics.median(spawn_time(["-c", "pass"], env) for _ in range(runs))
+    imports = statistics.median(spawn_time(["-c", "import pygame"], env) for _ in range(runs))
+    first_frame = statistics.median(spawn_time(["Game.py"], env) for _ in range(runs))
+
+    print("Запуск: медиана по", runs, "запускам")
+    print(f"{'интерпретатор':>16} {interpreter:>10.1f} мс")
+    print(f"{'+ import pygame':>16} {imports:>10.1f} мс")
+    print(f"{'первый кадр':>16} {first_frame:>10.1f} мс (бюджет {STARTUP_BUDGET_MS} мс)")
+    if first_frame > STARTUP_BUDGET_MS:
+        print("Бюджет запуска превышен")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    bench_setup_field()
+    bench_bitboard()
+    check_clear_zone()
+    if not bench_startup():
+        sys.exit(1)
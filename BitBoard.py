@@ -0,0 +1,181 @@
+import random
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+class BitBoard:
+    """Игровое поле на битовых масках - целых числах произвольной длины
+
+    Вариант Board без NumPy: слои мин, открытых клеток и флагов хранятся как
+    int, по биту на клетку. Номер бита клетки (i, j) равен i * stride + j,
+    где stride = height + 2, то есть у поля та же рамка, что у Board, и
+    сдвиги на соседей никогда не переносят бит с одного края на другой.
+    Числа мин вокруг хранятся четырьмя битовыми плоскостями, а пустые
+    области открываются расширением фронта сдвигами и масками.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.stride = height + 2
+        column = ((1 << height) - 1) << 1
+        self.inner = 0  # маска клеток поля без рамки
+        for i in range(1, width + 1):
+            self.inner |= column << (i * self.stride)
+        self.reset()
+
+    def reset(self):
+        """Сброс всех слоев - несколько присваиваний независимо от размера поля"""
+        self.mines = 0
+        self.opened = 0
+        self.flags = 0
+        self.counts = (0, 0, 0, 0)  # биты 0..3 числа мин вокруг
+        self.zero = 0  # клетки без мин и без мин вокруг
+        self.opened_count = 0
+
+    def _index(self, i: int, j: int) -> int:
+        return i * self.stride + j
+
+    def inside(self, i: int, j: int) -> bool:
+        return 1 <= i <= self.width and 1 <= j <= self.height
+
+    def is_mine(self, i: int, j: int) -> bool:
+        return bool(self.mines >> self._index(i, j) & 1)
+
+    def is_opened(self, i: int, j: int) -> bool:
+        return bool(self.opened >> self._index(i, j) & 1)
+
+    def is_flag(self, i: int, j: int) -> bool:
+        return bool(self.flags >> self._index(i, j) & 1)
+
+    def nearby_mines(self, i: int, j: int) -> int:
+        index = self._index(i, j)
+        return sum((plane >> index & 1) << bit for bit, plane in enumerate(self.counts))
+
+    def set_mine(self, i: int, j: int, value: bool = True):
+        if value:
+            self.mines |= 1 << self._index(i, j)
+        else:
+            self.mines &= ~(1 << self._index(i, j))
+
+    def set_flag(self, i: int, j: int):
+        self.flags |= 1 << self._index(i, j)
+
+    def delete_flag(self, i: int, j: int):
+        self.flags &= ~(1 << self._index(i, j))
+
+    def mines_count(self) -> int:
+        return popcount(self.mines)
+
+    def flags_count(self) -> int:
+        return popcount(self.flags)
+
+    def is_won(self) -> bool:
+        """Открыто все, кроме мин"""
+        return self.opened == self.inner & ~self.mines
+
+    def safe_zone(self, i: int, j: int, mines: int) -> list:
+        """Клетки, в которые нельзя ставить мины при первом ходе (как в Board)"""
+        zone = [(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                if self.inside(i + di, j + dj)]
+        if self.width * self.height - len(zone) < mines:
+            return [(i, j)]
+        return zone
+
+    def place_mines(self, count: int, excluded=(), rng=random) -> int:
+        """Расстановка ровно count мин, при том же rng - как Board.place_mines
+
+        Биты собираются в bytearray и переводятся в число одним вызовом, чтобы
+        не пересоздавать длинное целое на каждую мину.
+        """
+        height = self.height
+        skipped = sorted({(i - 1) * height + (j - 1) for i, j in excluded if self.inside(i, j)})
+        free = self.width * height - len(skipped)
+        count = max(0, min(count, free))
+
+        indices = rng.sample(range(free), count)
+        for index in skipped:
+            indices = [value + 1 if value >= index else value for value in indices]
+
+        bits = bytearray(((self.width + 2) * self.stride + 7) // 8)
+        for index in indices:
+            position = (index // height + 1) * self.stride + index % height + 1
+            bits[position >> 3] |= 1 << (position & 7)
+        self.mines |= int.from_bytes(bits, "little")
+        return count
+
+    def _shifts(self, mask: int) -> int:
+        """Объединение восьми сдвигов маски на соседние клетки"""
+        stride = self.stride
+        return (mask << 1 | mask >> 1 |
+                mask << stride | mask >> stride |
+                mask << stride + 1 | mask >> stride + 1 |
+                mask << stride - 1 | mask >> stride - 1)
+
+    def compute_nearby(self):
+        """Подсчет мин вокруг каждой клетки побитовым сумматором
+
+        Восемь сдвинутых копий слоя мин складываются в четыре битовые
+        плоскости, как в столбике двоичного сложения. Для клеток с миной
+        число, как и в Board, нулевое.
+        """
+        mines = self.mines
+        stride = self.stride
+        b0 = b1 = b2 = b3 = 0
+        for shift in (1, stride - 1, stride, stride + 1):
+            for layer in (mines << shift, mines >> shift):
+                carry0 = b0 & layer
+                b0 ^= layer
+                carry1 = b1 & carry0
+                b1 ^= carry0
+                carry2 = b2 & carry1
+                b2 ^= carry1
+                b3 |= carry2
+
+        empty = self.inner & ~mines
+        self.counts = (b0 & empty, b1 & empty, b2 & empty, b3 & empty)
+        self.zero = empty & ~(b0 | b1 | b2 | b3)
+
+    def _cells(self, mask: int) -> list:
+        """Клетки, биты которых стоят в маске"""
+        bits = bin(mask)[:1:-1]
+        stride = self.stride
+        cells = []
+        index = bits.find("1")
+        while index != -1:
+            cells.append(divmod(index, stride))
+            index = bits.find("1", index + 1)
+        return cells
+
+    def open(self, i: int, j: int) -> bool:
+        bit = 1 << self._index(i, j)
+        if self.opened & bit:
+            return False
+        self.opened |= bit
+        self.opened_count += 1
+        return True
+
+    def reveal(self, i: int, j: int) -> list:
+        """Открывает клетку и, если вокруг нет мин, всю пустую область
+
+        Каждый шаг добавляет к области соседей ее пустых клеток, еще не
+        открытых и без флага; шагов столько, сколько слоев у обхода в ширину.
+        Возвращает только что открытые клетки, как Board.reveal.
+        """
+        bit = 1 << self._index(i, j)
+        if (self.opened | self.flags) & bit:
+            return []
+
+        region = bit
+        if self.zero & bit:
+            passable = self.inner & ~(self.opened | self.flags)
+            frontier = bit
+            while frontier:
+                frontier = self._shifts(frontier & self.zero) & passable & ~region
+                region |= frontier
+
+        self.opened |= region
+        self.opened_count += popcount(region)
+        return self._cells(region)
@@ -0,0 +1,383 @@
+import random
+from collections import deque
+
+import numpy as np
+
+# Битовые флаги состояния клетки
+MINE = 1
+OPENED = 2
+FLAG = 4
+
+# Смещения восьми соседних клеток
+NEIGHBOURS = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+
+
+class Board:
+    """Игровое поле на массивах NumPy.
+
+    Состояние клетки упаковано в один байт (MINE | OPENED | FLAG), число мин
+    вокруг хранится в отдельном массиве. Как и прежний FIELD, поле имеет
+    рамку шириной в одну клетку, поэтому индексы клеток начинаются с 1.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.state = np.zeros((width + 2, height + 2), dtype=np.uint8)
+        self.nearby = np.zeros((width + 2, height + 2), dtype=np.uint8)
+        self.opened_count = 0
+        # Индекс пустых областей, строится после подсчета мин
+        self.region_labels = None
+        self.regions_count = 0
+        self._region_order = None
+        self._region_bounds = None
+        self._region_cells = {}
+        # Области, задетые правкой готового поля: открываются обычным обходом
+        self._stale_regions = set()
+        # Правка изменила набор пустых клеток: число областей надо пересчитать
+        self._regions_outdated = False
+
+    def inside(self, i: int, j: int) -> bool:
+        return 1 <= i <= self.width and 1 <= j <= self.height
+
+    def is_mine(self, i: int, j: int) -> bool:
+        return bool(self.state[i, j] & MINE)
+
+    def is_opened(self, i: int, j: int) -> bool:
+        return bool(self.state[i, j] & OPENED)
+
+    def is_flag(self, i: int, j: int) -> bool:
+        return bool(self.state[i, j] & FLAG)
+
+    def nearby_mines(self, i: int, j: int) -> int:
+        return int(self.nearby[i, j])
+
+    def set_mine(self, i: int, j: int, value: bool = True):
+        self.region_labels = None
+        if value:
+            self.state[i, j] |= MINE
+        else:
+            self.state[i, j] &= ~MINE & 0xFF
+
+    def open(self, i: int, j: int) -> bool:
+        """Открывает клетку, возвращает False, если она уже была открыта"""
+        if self.state[i, j] & OPENED:
+            return False
+        self.state[i, j] |= OPENED
+        self.opened_count += 1
+        return True
+
+    def reveal(self, i: int, j: int) -> list:
+        """Открывает клетку и, если вокруг нет мин, всю пустую область
+
+        Обход идет в ширину через очередь, каждая клетка посещается один раз.
+        Помеченные флагом клетки не открываются. Возвращает список только что
+        открытых клеток, чтобы их можно было отрисовать одним проходом.
+        """
+        if self.region_labels is not None and not self.state[i, j] & OPENED:
+            cells = self._reveal_region(self.region_labels[i, j])
+            if cells is not None:
+                return cells
+
+        if not self.open(i, j):
+            return []
+        opened = [(i, j)]
+        if self.nearby[i, j]:
+            return opened
+
+        state, nearby = self.state, self.nearby
+        width, height = self.width, self.height
+        queue = deque(opened)
+        while queue:
+            ci, cj = queue.popleft()
+            for di, dj in NEIGHBOURS:
+                ni, nj = ci + di, cj + dj
+                if not (1 <= ni <= width and 1 <= nj <= height) or state[ni, nj] & (OPENED | FLAG):
+                    continue
+                state[ni, nj] |= OPENED
+                opened.append((ni, nj))
+                if not nearby[ni, nj]:
+                    queue.append((ni, nj))
+
+        self.opened_count += len(opened) - 1
+        return opened
+
+    def set_flag(self, i: int, j: int):
+        self.state[i, j] |= FLAG
+
+    def delete_flag(self, i: int, j: int):
+        self.state[i, j] &= ~FLAG & 0xFF
+
+    def mines_count(self) -> int:
+        return int(np.count_nonzero(self.state & MINE))
+
+    def flags_count(self) -> int:
+        return int(np.count_nonzero(self.state & FLAG))
+
+    def safe_zone(self, i: int, j: int, mines: int) -> list:
+        """Клетки, в которые нельзя ставить мины при первом ходе
+
+        Исключается квадрат 3x3 вокруг клетки, а если для такого количества
+        мин места не хватает - только сама клетка.
+        """
+        zone = [(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                if self.inside(i + di, j + dj)]
+        if self.width * self.height - len(zone) < mines:
+            return [(i, j)]
+        return zone
+
+    def place_mines(self, count: int, excluded=(), rng=random) -> int:
+        """Расстановка ровно count мин за один проход
+
+        Выборка берется из номеров разрешенных клеток, после чего номера
+        сдвигаются через исключенные клетки, так что время зависит от числа
+        мин, а не от плотности поля. Возвращает число поставленных мин.
+        """
+        height = self.height
+        skipped = sorted({(i - 1) * height + (j - 1) for i, j in excluded if self.inside(i, j)})
+        free = self.width * height - len(skipped)
+        count = max(0, min(count, free))
+
+        indices = np.array(rng.sample(range(free), count), dtype=np.int64)
+        for index in skipped:
+            indices[indices >= index] += 1
+
+        self.state[indices // height + 1, indices % height + 1] |= MINE
+        self.region_labels = None
+        return count
+
+    def clear_zone(self, excluded, rng=random) -> int:
+        """Перенос мин из исключенных клеток в случайные свободные
+
+        Нужен для поля, подготовленного заранее без учета первого хода: мины
+        в безопасной зоне переставляются в равномерно случайные свободные
+        клетки вне ее, а числа и индекс областей обновляются только рядом с
+        изменениями. Возвращает число мин на поле.
+        """
+        zone = {(i, j) for i, j in excluded if self.inside(i, j)}
+        moved = [cell for cell in sorted(zone) if self.state[cell] & MINE]
+        changed = list(moved)
+        for cell in moved:
+            self.state[cell] &= ~MINE & 0xFF
+        for _ in moved:
+            cell = self._random_free_cell(zone, rng)
+            if cell is None:
+                # Свободных клеток не осталось, лишние мины пропадают, как в place_mines
+                break
+            self.state[cell] |= MINE
+            changed.append(cell)
+
+        zeros_changed = self._refresh_nearby(changed)
+        self._invalidate_regions(changed, zeros_changed)
+        return self.mines_count()
+
+    def _random_free_cell(self, zone: set, rng):
+        for _ in range(64):
+            index = rng.randrange(self.width * self.height)
+            cell = (index // self.height + 1, index % self.height + 1)
+            if not self.state[cell] & MINE and cell not in zone:
+                return cell
+        # Плотное поле: выбор из явного списка свободных клеток
+        cells = [(int(i) + 1, int(j) + 1) for i, j in np.argwhere((self.state[1:-1, 1:-1] & MINE) == 0)]
+        cells = [cell for cell in cells if cell not in zone]
+        return cells[rng.randrange(len(cells))] if cells else None
+
+    def _refresh_nearby(self, changed: list) -> bool:
+        """Пересчет чисел вокруг клеток, где поменялись мины
+
+        Возвращает True, если какая-то клетка стала пустой или перестала ею
+        быть. Мины в changed уже переставлены, поэтому прежнее наличие мины
+        в клетке из changed - обратное нынешнему.
+        """
+        state, nearby = self.state, self.nearby
+        flipped = set(changed)
+        zeros_changed = False
+        for ci, cj in {(ci + di, cj + dj) for ci, cj in changed for di in (-1, 0, 1) for dj in (-1, 0, 1)}:
+            if not self.inside(ci, cj):
+                continue
+            is_mine = bool(state[ci, cj] & MINE)
+            was_zero = is_mine == ((ci, cj) in flipped) and nearby[ci, cj] == 0
+            if is_mine:
+                nearby[ci, cj] = 0
+            else:
+                nearby[ci, cj] = np.count_nonzero(state[ci - 1:ci + 2, cj - 1:cj + 2] & MINE)
+            if was_zero != (not is_mine and nearby[ci, cj] == 0):
+                zeros_changed = True
+        return zeros_changed
+
+    def _invalidate_regions(self, changed: list, zeros_changed: bool = True):
+        """Пометка областей, которых могла коснуться правка
+
+        Числа меняются в квадрате 3x3 вокруг мины, а пустые клетки рядом с
+        ними - в квадрате 5x5, поэтому устаревшими считаются все области,
+        попавшие в него. Новая пустая клетка может не касаться ни одной
+        размеченной области, так что при любой смене пустых клеток еще и
+        помечается, что число областей надо пересчитать.
+        """
+        if self.region_labels is None:
+            return
+        if zeros_changed:
+            self._regions_outdated = True
+        for ci, cj in changed:
+            window = self.region_labels[max(ci - 2, 0):ci + 3, max(cj - 2, 0):cj + 3]
+            self._stale_regions.update(np.unique(window[window != 0]).tolist())
+
+    def adopt(self, other: "Board"):
+        """Перенос содержимого готового поля тех же размеров без копирования"""
+        self.state = other.state
+        self.nearby = other.nearby
+        self.opened_count = other.opened_count
+        self.region_labels = other.region_labels
+        self.regions_count = other.regions_count
+        self._region_order = other._region_order
+        self._region_bounds = other._region_bounds
+        self._region_cells = other._region_cells
+        self._stale_regions = other._stale_regions
+        self._regions_outdated = other._regions_outdated
+
+    def mine_positions(self) -> list:
+        return [(int(i), int(j)) for i, j in np.argwhere(self.state & MINE)]
+
+    def window(self, i0: int, i1: int, j0: int, j1: int) -> tuple:
+        """Состояние и числа клеток прямоугольника [i0, i1] x [j0, j1] без копирования"""
+        return self.state[i0:i1 + 1, j0:j1 + 1], self.nearby[i0:i1 + 1, j0:j1 + 1]
+
+    def compute_nearby(self, vectorized: bool = True):
+        """Подсчет мин вокруг каждой клетки
+
+        Векторный путь складывает восемь сдвигов маски мин внутри рамки,
+        поэтому выход за границы поля проверять не нужно. Для клеток с миной,
+        как и раньше, число остается нулевым.
+        """
+        if not vectorized:
+            self._compute_nearby_python()
+            return
+
+        mines = self.state & MINE
+        counts = np.zeros_like(mines)
+        inner = counts[1:-1, 1:-1]
+        for di, dj in NEIGHBOURS:
+            inner += mines[1 + di:self.width + 1 + di, 1 + dj:self.height + 1 + dj]
+        counts[mines != 0] = 0
+        self.nearby = counts
+        self.region_labels = None
+
+    def _compute_nearby_python(self):
+        """Запасной вариант подсчета на чистом Python"""
+        mines = (self.state & MINE).tolist()
+        counts = [[0] * (self.height + 2) for _ in range(self.width + 2)]
+        for i in range(1, self.width + 1):
+            for j in range(1, self.height + 1):
+                if not mines[i][j]:
+                    k = 0
+                    for di, dj in NEIGHBOURS:
+                        k += mines[i + di][j + dj]
+                    counts[i][j] = k
+        self.nearby = np.array(counts, dtype=np.uint8)
+        self.region_labels = None
+
+    def build_regions(self):
+        """Разметка связных областей пустых клеток
+
+        Пустые клетки сначала объединяются в вертикальные отрезки, затем
+        отрезки соседних столбцов (с учетом диагоналей) сливаются через
+        систему непересекающихся множеств. Вызывается один раз после
+        подсчета мин, пока поле не меняется.
+        """
+        zero = np.zeros(self.state.shape, dtype=bool)
+        zero[1:-1, 1:-1] = ((self.state[1:-1, 1:-1] & MINE) == 0) & (self.nearby[1:-1, 1:-1] == 0)
+
+        starts = zero.copy()
+        starts[:, 1:] &= ~zero[:, :-1]
+        runs = np.cumsum(starts.ravel()).reshape(zero.shape) * zero
+        runs_count = int(runs.max(initial=0))
+
+        parent = list(range(runs_count + 1))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        width, height = self.width, self.height
+        for dj in (-1, 0, 1):
+            left = runs[1:width, 1:height + 1]
+            right = runs[2:width + 1, 1 + dj:height + 1 + dj]
+            touching = (left != 0) & (right != 0)
+            if not touching.any():
+                continue
+            pairs = np.unique(left[touching].astype(np.int64) * (runs_count + 1) + right[touching])
+            for a, b in zip((pairs // (runs_count + 1)).tolist(), (pairs % (runs_count + 1)).tolist()):
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+
+        roots = np.array([find(x) for x in range(runs_count + 1)])
+        _, run_labels = np.unique(roots, return_inverse=True)
+        self.region_labels = run_labels.reshape(-1)[runs]
+        self.regions_count = runs_count and int(run_labels.max())
+
+        flat = self.region_labels.ravel()
+        cells = np.flatnonzero(flat)
+        self._region_order = cells[np.argsort(flat[cells], kind="stable")]
+        self._region_bounds = np.searchsorted(flat[self._region_order],
+                                              np.arange(1, self.regions_count + 2))
+        self._region_cells = {}
+        self._stale_regions = set()
+        self._regions_outdated = False
+
+    def openings(self) -> int:
+        """Количество пустых областей (\"проемов\") на поле"""
+        if self.region_labels is None or self._stale_regions or self._regions_outdated:
+            self.build_regions()
+        return self.regions_count
+
+    def region_cells(self, label: int) -> np.ndarray:
+        """Плоские индексы клеток области вместе с ее числовой границей"""
+        cells = self._region_cells.get(label)
+        if cells is None:
+            zero_cells = self._region_order[self._region_bounds[label - 1]:self._region_bounds[label]]
+            stride = self.height + 2
+            offsets = np.array([di * stride + dj for di in (-1, 0, 1) for dj in (-1, 0, 1)])
+            if len(zero_cells) * len(offsets) > self.state.size // 8:
+                # Большая область: расширение через маску всего поля
+                mask = np.zeros(self.state.size, dtype=bool)
+                for offset in offsets:
+                    mask[zero_cells + offset] = True
+                cells = np.flatnonzero(mask)
+            else:
+                cells = np.unique((zero_cells[:, None] + offsets[None, :]).ravel())
+            i, j = cells // stride, cells % stride
+            cells = cells[(i >= 1) & (i <= self.width) & (j >= 1) & (j <= self.height)]
+            self._region_cells[label] = cells
+        return cells
+
+    def _reveal_region(self, label: int):
+        """Открытие заранее размеченной области
+
+        Возвращает None, если клетка не пустая или внутри области стоят
+        флаги - тогда область открывается обычным обходом.
+        """
+        if not label or label in self._stale_regions:
+            return None
+        cells = self.region_cells(label)
+        flat = self.state.reshape(-1)
+        cell_state = flat[cells]
+        if (cell_state & FLAG).any():
+            return None
+
+        new_cells = cells[(cell_state & OPENED) == 0]
+        flat[new_cells] |= OPENED
+        self.opened_count += len(new_cells)
+        stride = self.height + 2
+        return list(zip((new_cells // stride).tolist(), (new_cells % stride).tolist()))
+
+    def reset(self):
+        """Сброс всего поля одной записью в массивы"""
+        self.state.fill(0)
+        self.nearby.fill(0)
+        self.opened_count = 0
+        self.region_labels = None
+        self._stale_regions = set()
+        self._regions_outdated = False
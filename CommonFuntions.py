@@ -3,9 +3,11 @@ import sys
 import os
 from typing import Tuple, List, Optional
 
-# Инициализация Pygame
-pygame.init()
-pygame.font.init()
+import Assets
+import Fonts
+import Pregen
+import ContentCache
+import Startup
 
 # Константы
 SCREEN_WIDTH = 600
@@ -14,7 +16,6 @@ BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 40
 BACKGROUND_SRC = "background.png"
 RULES_FILE = "./rules.txt"
-RECORDS_FILE = "./records.txt"
 FPS = 60
 
 # Цвета
@@ -35,14 +36,8 @@ BUTTON_TYPE = 0
 IS_MOUSE_DOWN = False
 
 
-class HighScore:
-    def __init__(self):
-        self.name = ""
-        self.score = 0
-
-
 def draw_title(surface: pygame.Surface, text: str, x: int, y: int, width: int, height: int):
-    font = pygame.font.SysFont('Arial', 20, bold=True)
+    font = Fonts.font(20, bold=True)
     text_surface = font.render(text, True, BLACK)
     text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
 
@@ -58,7 +53,7 @@ def draw_button(surface: pygame.Surface, x: int, y: int, width: int, height: int
     pygame.draw.rect(surface, LIGHT_GRAY, (x, y, width, height))
     pygame.draw.rect(surface, BLACK, (x, y, width, height), 1)
 
-    font = pygame.font.SysFont('Arial', 18)
+    font = Fonts.font(18)
     text_surface = font.render(text, True, BLACK)
     text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
     surface.blit(text_surface, text_rect)
@@ -68,46 +63,45 @@ def display_menu_main_step() -> str:
     global MOUSE_X, MOUSE_Y, BUTTON_TYPE, IS_MOUSE_DOWN
 
     # Настройки окна
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = Startup.window((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Игра 'Сапёр'")
 
-    # Загрузка фона
-    try:
-        background = pygame.image.load(BACKGROUND_SRC)
-        background = pygame.transform.scale(background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    except:
-        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        background.fill(WHITE)
+    # Фон декодируется один раз на все экраны
+    background = Assets.get_assets().scaled(BACKGROUND_SRC, (SCREEN_WIDTH, SCREEN_HEIGHT))
 
     clock = pygame.time.Clock()
     running = True
+    redraw = True
 
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.VIDEOEXPOSE:
+                redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 MOUSE_X, MOUSE_Y = event.pos
                 BUTTON_TYPE = event.button
                 IS_MOUSE_DOWN = True
 
-        # Отрисовка
-        screen.blit(background, (0, 0))
+        # Отрисовка (экран статичен, поэтому только после изменений)
+        if redraw:
+            screen.blit(background, (0, 0))
 
-        # Заголовок
-        draw_title(screen, "Игра ¤ Сапёр ⚑", 0, 20, 250, 60)
+            # Заголовок
+            draw_title(screen, "Игра ¤ Сапёр ⚑", 0, 20, 250, 60)
 
-        # Кнопки
-        draw_button(screen, 0, 100, BUTTON_WIDTH, BUTTON_HEIGHT, "Игра")
-        draw_button(screen, 0, 160, BUTTON_WIDTH, BUTTON_HEIGHT, "Правила")
-        draw_button(screen, 0, 220, BUTTON_WIDTH, BUTTON_HEIGHT, "Рекорды")
-        draw_button(screen, 0, 280, BUTTON_WIDTH, BUTTON_HEIGHT, "Выход")
+            # Кнопки
+            draw_button(screen, 0, 100, BUTTON_WIDTH, BUTTON_HEIGHT, "Игра")
+            draw_button(screen, 0, 160, BUTTON_WIDTH, BUTTON_HEIGHT, "Правила")
+            draw_button(screen, 0, 220, BUTTON_WIDTH, BUTTON_HEIGHT, "Рекорды")
+            draw_button(screen, 0, 280, BUTTON_WIDTH, BUTTON_HEIGHT, "Выход")
 
-        # Подпись внизу
-        font = pygame.font.SysFont('Arial', 10)
-        text_surface = font.render("© Николаев Максим, группа 243", True, BLACK)
-        screen.blit(text_surface, (0, 360))
+            # Подпись внизу
+            font = Fonts.font(10)
+            text_surface = font.render("© Николаев Максим, группа 243", True, BLACK)
+            screen.blit(text_surface, (0, 360))
 
         # Проверка кликов по кнопкам
         if IS_MOUSE_DOWN:
@@ -130,7 +124,9 @@ def display_menu_main_step() -> str:
                 pygame.quit()
                 sys.exit()
 
-        pygame.display.flip()
+        if redraw:
+            pygame.display.flip()
+            redraw = False
         clock.tick(FPS)
 
     return "MenuMainStep"
@@ -139,41 +135,42 @@ def display_menu_main_step() -> str:
 def display_menu_game_step() -> Tuple[str, int, int, int, int]:
     global MOUSE_X, MOUSE_Y, BUTTON_TYPE, IS_MOUSE_DOWN, GAME_LEVEL, FIELD_WIDTH, FIELD_HEIGHT, FIELD_MINES_COUNT
 
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = Startup.window((SCREEN_WIDTH, SCREEN_HEIGHT))
 
-    # Загрузка фона
-    try:
-        background = pygame.image.load(BACKGROUND_SRC)
-        background = pygame.transform.scale(background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    except:
-        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        background.fill(WHITE)
+    # Фон декодируется один раз на все экраны
+    background = Assets.get_assets().scaled(BACKGROUND_SRC, (SCREEN_WIDTH, SCREEN_HEIGHT))
 
     clock = pygame.time.Clock()
     running = True
+    redraw = True
+    # Пока игрок выбирает уровень, поля для всех уровней готовятся в фоне
+    Pregen.get_pregenerator().prepare_levels()
 
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.VIDEOEXPOSE:
+                redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 MOUSE_X, MOUSE_Y = event.pos
                 BUTTON_TYPE = event.button
                 IS_MOUSE_DOWN = True
 
-        # Отрисовка
-        screen.blit(background, (0, 0))
+        # Отрисовка (экран статичен, поэтому только после изменений)
+        if redraw:
+            screen.blit(background, (0, 0))
 
-        # Заголовок
-        draw_title(screen, "Уровень:", 0, 20, 270, 60)
+            # Заголовок
+            draw_title(screen, "Уровень:", 0, 20, 270, 60)
 
-        # Кнопки уровней
-        draw_button(screen, 0, 100, BUTTON_WIDTH, BUTTON_HEIGHT, "Легкий")
-        draw_button(screen, 0, 160, BUTTON_WIDTH, BUTTON_HEIGHT, "Нормальный")
-        draw_button(screen, 0, 220, BUTTON_WIDTH, BUTTON_HEIGHT, "Сложный")
-        draw_button(screen, 0, 280, BUTTON_WIDTH, BUTTON_HEIGHT, "Свой")
-        draw_button(screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
+            # Кнопки уровней
+            draw_button(screen, 0, 100, BUTTON_WIDTH, BUTTON_HEIGHT, "Легкий")
+            draw_button(screen, 0, 160, BUTTON_WIDTH, BUTTON_HEIGHT, "Нормальный")
+            draw_button(screen, 0, 220, BUTTON_WIDTH, BUTTON_HEIGHT, "Сложный")
+            draw_button(screen, 0, 280, BUTTON_WIDTH, BUTTON_HEIGHT, "Свой")
+            draw_button(screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
 
         # Проверка кликов по кнопкам
         if IS_MOUSE_DOWN:
@@ -211,7 +208,9 @@ def display_menu_game_step() -> Tuple[str, int, int, int, int]:
             elif 0 <= MOUSE_X <= BUTTON_WIDTH and 340 <= MOUSE_Y <= 380 and BUTTON_TYPE == 1:
                 return "MenuMainStep", GAME_LEVEL, FIELD_WIDTH, FIELD_HEIGHT, FIELD_MINES_COUNT
 
-        pygame.display.flip()
+        if redraw:
+            pygame.display.flip()
+            redraw = False
         clock.tick(FPS)
 
     return "MenuMainStep", GAME_LEVEL, FIELD_WIDTH, FIELD_HEIGHT, FIELD_MINES_COUNT
@@ -220,57 +219,39 @@ def display_menu_game_step() -> Tuple[str, int, int, int, int]:
 def display_rules_step() -> str:
     global MOUSE_X, MOUSE_Y, BUTTON_TYPE, IS_MOUSE_DOWN
 
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-
-    # Загрузка фона
-    try:
-        background = pygame.image.load(BACKGROUND_SRC)
-        background = pygame.transform.scale(background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    except:
-        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        background.fill(WHITE)
+    screen = Startup.window((SCREEN_WIDTH, SCREEN_HEIGHT))
 
-    # Загрузка правил из файла
-    try:
-        with open(RULES_FILE, 'r', encoding='utf-8') as f:
-            rules_text = f.read()
-    except:
-        rules_text = "Файл с правилами не найден"
+    # Фон декодируется один раз на все экраны
+    background = Assets.get_assets().scaled(BACKGROUND_SRC, (SCREEN_WIDTH, SCREEN_HEIGHT))
 
     clock = pygame.time.Clock()
     running = True
+    redraw = True
 
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.VIDEOEXPOSE:
+                redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 MOUSE_X, MOUSE_Y = event.pos
                 BUTTON_TYPE = event.button
                 IS_MOUSE_DOWN = True
 
-        # Отрисовка
-        screen.blit(background, (0, 0))
+        # Отрисовка (экран статичен, поэтому только после изменений)
+        if redraw:
+            screen.blit(background, (0, 0))
 
-        # Заголовок
-        draw_title(screen, "Правила игры:", 0, 20, 250, 60)
+            # Заголовок
+            draw_title(screen, "Правила игры:", 0, 20, 250, 60)
 
-        # Полупрозрачный прямоугольник для текста
-        overlay = pygame.Surface((560, 240), pygame.SRCALPHA)
-        overlay.fill(SEMI_TRANSPARENT)
-        screen.blit(overlay, (0, 80))
+            # Текст правил на полупрозрачной панели, собранной один раз
+            screen.blit(ContentCache.get_content().rules_panel(RULES_FILE), ContentCache.PANEL_POS)
 
-        # Текст правил
-        font = pygame.font.SysFont('Arial', 10)
-        y_offset = 120
-        for line in rules_text.split('\n'):
-            text_surface = font.render(line, True, BLACK)
-            screen.blit(text_surface, (40, y_offset))
-            y_offset += 20
-
-        # Кнопка "Назад"
-        draw_button(screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
+            # Кнопка "Назад"
+            draw_button(screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
 
         # Проверка кликов по кнопкам
         if IS_MOUSE_DOWN:
@@ -280,7 +261,9 @@ def display_rules_step() -> str:
             if 0 <= MOUSE_X <= BUTTON_WIDTH and 340 <= MOUSE_Y <= 380 and BUTTON_TYPE == 1:
                 return "MenuMainStep"
 
-        pygame.display.flip()
+        if redraw:
+            pygame.display.flip()
+            redraw = False
         clock.tick(FPS)
 
     return "MenuMainStep"
@@ -289,67 +272,39 @@ def display_rules_step() -> str:
 def display_records_step() -> str:
     global MOUSE_X, MOUSE_Y, BUTTON_TYPE, IS_MOUSE_DOWN
 
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-
-    # Загрузка фона
-    try:
-        background = pygame.image.load(BACKGROUND_SRC)
-        background = pygame.transform.scale(background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    except:
-        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        background.fill(WHITE)
-
-    # Загрузка рекордов из файла
-    players = [HighScore() for _ in range(3)]
-    try:
-        with open(RECORDS_FILE, 'r', encoding='utf-8') as f:
-            for i in range(3):
-                players[i].name = f.readline().strip()
-                players[i].score = int(f.readline().strip())
-    except:
-        for i in range(3):
-            players[i].name = "Нет данных"
-            players[i].score = 0
+    screen = Startup.window((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    # Фон декодируется один раз на все экраны
+    background = Assets.get_assets().scaled(BACKGROUND_SRC, (SCREEN_WIDTH, SCREEN_HEIGHT))
 
     clock = pygame.time.Clock()
     running = True
+    redraw = True
 
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.VIDEOEXPOSE:
+                redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 MOUSE_X, MOUSE_Y = event.pos
                 BUTTON_TYPE = event.button
                 IS_MOUSE_DOWN = True
 
-        # Отрисовка
-        screen.blit(background, (0, 0))
-
-        # Заголовок
-        draw_title(screen, "Рекорды:", 0, 20, 250, 60)
-
-        # Полупрозрачный прямоугольник для текста
-        overlay = pygame.Surface((560, 240), pygame.SRCALPHA)
-        overlay.fill(SEMI_TRANSPARENT)
-        screen.blit(overlay, (0, 80))
+        # Отрисовка (экран статичен, поэтому только после изменений)
+        if redraw:
+            screen.blit(background, (0, 0))
 
-        # Вывод рекордов
-        font = pygame.font.SysFont('Arial', 18)
-        for i in range(3):
-            level_name = ["Новичок", "Любитель", "Профессионал"][i]
+            # Заголовок
+            draw_title(screen, "Рекорды:", 0, 20, 250, 60)
 
-            if players[i].score != 0:
-                text = f"{level_name}: {players[i].name} {players[i].score}сек."
-            else:
-                text = f"{level_name}: рекорда нет"
+            # Лучшие результаты уровней из базы рекордов
+            screen.blit(ContentCache.get_content().records_panel(), ContentCache.PANEL_POS)
 
-            text_surface = font.render(text, True, BLACK)
-            screen.blit(text_surface, (40, 120 + i * 60))
-
-        # Кнопка "Назад"
-        draw_button(screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
+            # Кнопка "Назад"
+            draw_button(screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
 
         # Проверка кликов по кнопкам
         if IS_MOUSE_DOWN:
@@ -359,7 +314,9 @@ def display_records_step() -> str:
             if 0 <= MOUSE_X <= BUTTON_WIDTH and 340 <= MOUSE_Y <= 380 and BUTTON_TYPE == 1:
                 return "MenuMainStep"
 
-        pygame.display.flip()
+        if redraw:
+            pygame.display.flip()
+            redraw = False
         clock.tick(FPS)
 
     return "MenuMainStep"
@@ -369,11 +326,12 @@ def main():
     global PROGRAM_STEP, GAME_LEVEL, FIELD_WIDTH, FIELD_HEIGHT, FIELD_MINES_COUNT
 
     # Проверка наличия необходимых файлов
-    if not (os.path.exists(RULES_FILE) and os.path.exists(RECORDS_FILE)):
+    if not os.path.exists(RULES_FILE):
         print("Ошибка! Отсутствуют необходимые файлы")
         pygame.quit()
         sys.exit()
 
+    Startup.init()
     pygame.display.set_caption("Игра 'Сапёр'")
 
     # Основной игровой цикл
@@ -0,0 +1,118 @@
+import os
+import time
+
+import pygame
+
+import Fonts
+import Records
+
+# Время изменения файлов проверяется не чаще, чем раз в столько секунд
+CHECK_INTERVAL = 1.0
+# Файлы из старых версий игры записаны в cp1251
+ENCODINGS = ("utf-8", "cp1251")
+
+# Панель текста на экранах правил и рекордов
+PANEL_POS = (0, 80)
+PANEL_SIZE = (560, 240)
+PANEL_COLOR = (255, 255, 255, 200)
+TEXT_COLOR = (0, 0, 0)
+# Отступ первой строки от угла панели
+TEXT_OFFSET = (40, 40)
+RULES_FONT_SIZE = 10
+RULES_LINE_HEIGHT = 20
+RECORDS_FONT_SIZE = 18
+RECORDS_LINE_HEIGHT = 36
+
+
+def read_lines(path: str) -> list:
+    """Строки текстового файла в первой подошедшей кодировке"""
+    with open(path, "rb") as f:
+        data = f.read()
+    for encoding in ENCODINGS:
+        try:
+            return data.decode(encoding).splitlines()
+        except UnicodeDecodeError:
+            continue
+    return data.decode(ENCODINGS[0], errors="replace").splitlines()
+
+
+class ContentCache:
+    """Содержимое файлов и собранные из него панели текста
+
+    Файл читается один раз и перечитывается, только когда у него меняется
+    время изменения или размер. Панель - готовая поверхность с подложкой и
+    всеми строками, так что экран правил или рекордов рисуется одним blit.
+    """
+
+    def __init__(self):
+        self.stamps = {}  # путь -> (время проверки, отметка файла)
+        self.texts = {}  # путь -> (отметка файла, строки)
+        self.panels = {}  # ключ -> (отметка содержимого, поверхность)
+
+    def stamp(self, path: str):
+        """(время изменения, размер) файла или None, если его нет"""
+        now = time.monotonic()
+        checked = self.stamps.get(path)
+        if checked is not None and now - checked[0] < CHECK_INTERVAL:
+            return checked[1]
+        try:
+            info = os.stat(path)
+            value = (info.st_mtime_ns, info.st_size)
+        except OSError:
+            value = None
+        self.stamps[path] = (now, value)
+        return value
+
+    def lines(self, path: str) -> list:
+        """Строки файла, None - файла нет или он не читается"""
+        stamp = self.stamp(path)
+        cached = self.texts.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            lines = read_lines(path) if stamp is not None else None
+        except OSError:
+            lines = None
+        self.texts[path] = (stamp, lines)
+        return lines
+
+    def panel(self, key, stamp, build, font_size: int, line_height: int) -> pygame.Surface:
+        """Панель со строками build(); собирается заново только при смене stamp"""
+        cached = self.panels.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        lines = build()
+        surface = pygame.Surface(PANEL_SIZE, pygame.SRCALPHA)
+        surface.fill(PANEL_COLOR)
+        font = Fonts.font(font_size)
+        x, y = TEXT_OFFSET
+        # Длинный текст сжимается по высоте, чтобы остаться на панели
+        step = min(line_height, (PANEL_SIZE[1] - y - font.get_linesize()) // max(1, len(lines) - 1))
+        for line in lines:
+            surface.blit(font.render(line, True, TEXT_COLOR), (x, y))
+            y += step
+        self.panels[key] = (stamp, surface)
+        return surface
+
+    def rules_panel(self, path: str) -> pygame.Surface:
+        return self.panel(("rules", path), self.stamp(path),
+                          lambda: self.lines(path) or ["Файл с правилами не найден"],
+                          RULES_FONT_SIZE, RULES_LINE_HEIGHT)
+
+    def records_panel(self) -> pygame.Surface:
+        records = Records.get_records()
+        # Свои записи видны по счетчику, записи других процессов - по файлу базы
+        stamp = (records.revision, self.stamp(records.path))
+        return self.panel("records", stamp, records.summary, RECORDS_FONT_SIZE, RECORDS_LINE_HEIGHT)
+
+
+_content = None
+
+
+def get_content() -> ContentCache:
+    """Общий кэш на все экраны процесса"""
+    global _content
+    if _content is None:
+        _content = ContentCache()
+    return _content
@@ -0,0 +1,39 @@
+import pygame
+
+
+class DirtyRects:
+    """Накопитель измененных областей экрана
+
+    Вместо pygame.display.flip() после каждого действия на экран выводятся
+    только прямоугольники, которые действительно перерисовывались. Полное
+    обновление делается после смены размера окна и наложений (invalidate).
+    """
+
+    # При большом числе прямоугольников выгоднее обновить их общую рамку
+    MAX_RECTS = 64
+
+    def __init__(self):
+        self.rects = []
+        self.full = True
+
+    def add(self, rect):
+        if not self.full:
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """Следующий вывод обновит весь экран"""
+        self.full = True
+        self.rects = []
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.rects)
+
+    def flush(self):
+        if self.full:
+            pygame.display.flip()
+        elif len(self.rects) > self.MAX_RECTS:
+            pygame.display.update(self.rects[0].unionall(self.rects[1:]))
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.full = False
+        self.rects = []
@@ -0,0 +1,58 @@
+import pygame
+
+DEFAULT_FAMILY = "Arial"
+
+
+class FontRegistry:
+    """Шрифты всех модулей, найденные через SysFont по одному разу
+
+    SysFont при каждом вызове просматривает список системных шрифтов,
+    поэтому шрифт (семейство, размер, жирность) ищется один раз, а дальше
+    выдается готовый объект. pygame.quit уничтожает шрифты, и реестр
+    очищается вместе с ним.
+    """
+
+    def __init__(self):
+        self.fonts = {}
+        self.lookups = 0  # вызовы SysFont
+        self.hits = 0  # запросы, обслуженные без SysFont
+        self.registered = False
+
+    def get(self, size: int, bold: bool = False, family: str = DEFAULT_FAMILY) -> pygame.font.Font:
+        key = (family.lower(), size, bold)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+        if not pygame.font.get_init():
+            pygame.font.init()
+        if not self.registered:
+            # pygame забывает обработчики после каждого quit, регистрируемся заново
+            pygame.register_quit(self.clear)
+            self.registered = True
+        font = self.fonts[key] = pygame.font.SysFont(family, size, bold=bold)
+        self.lookups += 1
+        return font
+
+    def report(self) -> str:
+        return (f"Шрифты: {len(self.fonts)} в реестре, поисков SysFont {self.lookups}, "
+                f"сэкономлено {self.hits}")
+
+    def clear(self):
+        self.fonts.clear()
+        self.registered = False
+
+
+_registry = None
+
+
+def get_fonts() -> FontRegistry:
+    """Общий реестр шрифтов процесса"""
+    global _registry
+    if _registry is None:
+        _registry = FontRegistry()
+    return _registry
+
+
+def font(size: int, bold: bool = False, family: str = DEFAULT_FAMILY) -> pygame.font.Font:
+    return get_fonts().get(size, bold, family)
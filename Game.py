@@ -7,25 +7,30 @@ import GameLevelForm
 import GlobalConstants
 import GlobalVariables
 import CommonFuntions
+from DirtyRects import DirtyRects
+import Assets
+import Fonts
+import Pregen
+import NoGuess
+import ContentCache
+import Startup
 
 from typing import Tuple, List, Optional, Dict
 
-# Инициализация Pygame
-pygame.init()
-pygame.font.init()
-
 # Константы игры
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 400
 BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 40
 CELL_SIZE = 39
+# Переключатель режима без угадывания в меню уровней
+NO_GUESS_X = 260
+NO_GUESS_WIDTH = 240
 FPS = 60
 
 # Пути к файлам
 BACKGROUND_SRC = "background.png"
 RULES_FILE = "rules.txt"
-RECORDS_FILE = "records.txt"
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -35,11 +40,7 @@ SEMI_TRANSPARENT_WHITE = (255, 255, 255, 200)
 SEMI_TRANSPARENT_BLACK = (0, 0, 0, 100)
 
 # Уровни сложности
-LEVELS = {
-    0: {"name": "Легкий", "width": 8, "height": 8, "mines": 10},
-    1: {"name": "Нормальный", "width": 16, "height": 16, "mines": 40},
-    2: {"name": "Сложный", "width": 30, "height": 19, "mines": 70}
-}
+LEVELS = GlobalConstants.LEVELS
 
 
 @dataclass
@@ -60,6 +61,10 @@ class GameState:
         self.field_width = LEVELS[0]["width"]
         self.field_height = LEVELS[0]["height"]
         self.field_mines_count = LEVELS[0]["mines"]
+        # Зерно генерации поля, None - случайное
+        self.seed = None
+        # Поля, которые проходятся без угадывания
+        self.no_guess = False
         self.mouse_pos = (0, 0)
         self.mouse_button = 0
         self.is_mouse_down = False
@@ -79,6 +84,7 @@ class GameState:
             self.field_width = LEVELS[level]["width"]
             self.field_height = LEVELS[level]["height"]
             self.field_mines_count = LEVELS[level]["mines"]
+            self.seed = None
             self.initialize_field()
 
 
@@ -87,22 +93,16 @@ class GameUI:
 
     def __init__(self):
         self.fonts = {
-            "title": pygame.font.SysFont('Arial', 20, bold=True),
-            "button": pygame.font.SysFont('Arial', 18),
-            "text": pygame.font.SysFont('Arial', 10),
-            "records": pygame.font.SysFont('Arial', 18)
+            "title": Fonts.font(20, bold=True),
+            "button": Fonts.font(18),
+            "text": Fonts.font(10),
+            "records": Fonts.font(18)
         }
         self.background = self.load_background()
 
     def load_background(self) -> pygame.Surface:
         """Загрузка фонового изображения"""
-        try:
-            background = pygame.image.load(BACKGROUND_SRC)
-            return pygame.transform.scale(background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        except:
-            background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            background.fill(WHITE)
-            return background
+        return Assets.get_assets().scaled(BACKGROUND_SRC, (SCREEN_WIDTH, SCREEN_HEIGHT))
 
     def draw_title(self, surface: pygame.Surface, text: str, x: int, y: int, width: int, height: int):
         """Отрисовка заголовка"""
@@ -128,12 +128,16 @@ class MinesweeperGame:
     """Основной класс игры"""
 
     def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Игра "Сапёр"')
+        # pygame поднимается здесь, а не при импорте, и только нужными подсистемами
+        self.screen = Startup.window((SCREEN_WIDTH, SCREEN_HEIGHT), 'Игра "Сапёр"')
         self.clock = pygame.time.Clock()
         self.state = GameState()
         self.ui = GameUI()
-        self.game_logic = None
+        # Партии идут в одном окне, рестарт сбрасывает поле на месте
+        self.session = GameLogic.GameSession()
+        # Меню статичны: экран перерисовывается только при смене шага
+        self.display = DirtyRects()
+        self.rendered_step = None
 
     def run(self):
         """Запуск основного цикла игры"""
@@ -141,15 +145,26 @@ class MinesweeperGame:
             print("Ошибка! Отсутствуют необходимые файлы")
             return
 
-        while True:
-            self.handle_events()
-            self.update()
-            self.render()
-            self.clock.tick(FPS)
+        started = False
+        try:
+            while True:
+                self.handle_events()
+                self.update()
+                self.render()
+                if not started:
+                    started = True
+                    if GlobalConstants.DEBUG_MODE:
+                        print(Fonts.get_fonts().report())
+                    Startup.first_frame()
+                self.clock.tick(FPS)
+        finally:
+            # Все выходы идут через sys.exit; фоновая генерация полей не должна их задерживать
+            Pregen.get_pregenerator().close()
+            NoGuess.get_pool().close()
 
     def check_files(self) -> bool:
-        """Проверка наличия необходимых файлов"""
-        return os.path.exists(RULES_FILE) and os.path.exists(RECORDS_FILE)
+        """Проверка наличия необходимых файлов (база рекордов создается сама)"""
+        return os.path.exists(RULES_FILE)
 
     def handle_events(self):
         """Обработка событий"""
@@ -157,6 +172,8 @@ class MinesweeperGame:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.display.invalidate()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self.state.mouse_pos = event.pos
                 self.state.mouse_button = event.button
@@ -185,6 +202,8 @@ class MinesweeperGame:
 
             if 0 <= x <= BUTTON_WIDTH and 100 <= y <= 140 and self.state.mouse_button == 1:
                 self.state.program_step = "MenuGameStep"
+                # Пока игрок выбирает уровень, поля для всех уровней готовятся в фоне
+                Pregen.get_pregenerator().prepare_levels()
             elif 0 <= x <= BUTTON_WIDTH and 160 <= y <= 200 and self.state.mouse_button == 1:
                 self.state.program_step = "RulesStep"
             elif 0 <= x <= BUTTON_WIDTH and 220 <= y <= 260 and self.state.mouse_button == 1:
@@ -206,7 +225,10 @@ class MinesweeperGame:
                     self.start_game()
                     return
 
-            if 0 <= x <= BUTTON_WIDTH and 280 <= y <= 320 and self.state.mouse_button == 1:
+            if NO_GUESS_X <= x <= NO_GUESS_X + NO_GUESS_WIDTH and 100 <= y <= 140 and self.state.mouse_button == 1:
+                self.state.no_guess = not self.state.no_guess
+                self.display.invalidate()
+            elif 0 <= x <= BUTTON_WIDTH and 280 <= y <= 320 and self.state.mouse_button == 1:
                 self.state.program_step = "GameLevelFormStep"
             elif 0 <= x <= BUTTON_WIDTH and 340 <= y <= 380 and self.state.mouse_button == 1:
                 self.state.program_step = "MenuMainStep"
@@ -214,42 +236,37 @@ class MinesweeperGame:
     def update_custom_level_form(self):
         """Обновление формы пользовательского уровня"""
         # Получаем настройки пользовательского уровня
-        level, width, height, mines = GameLevelForm.display_game_level_form()
+        level, width, height, mines, seed = GameLevelForm.display_game_level_form()
 
         # Устанавливаем параметры игры
         self.state.game_level = level
         self.state.field_width = width
         self.state.field_height = height
         self.state.field_mines_count = mines
+        self.state.seed = seed
         self.state.initialize_field()
 
         # Запускаем игру
         self.start_game()
 
     def start_game(self):
-        """Запуск игры с текущими параметрами"""
-        # Сохраняем текущее состояние экрана
-        saved_screen = self.screen.copy()
-
-        # Инициализируем игровую логику
-        self.game_logic = GameLogic.GameLogic(
+        """Запуск игры с текущими параметрами; рестарты обрабатывает сессия в цикле"""
+        result = self.session.play(
             self.state.field_width,
             self.state.field_height,
-            self.state.field_mines_count
+            self.state.field_mines_count,
+            self.state.seed,
+            self.state.no_guess
         )
+        if result == "Exit":
+            pygame.quit()
+            sys.exit()
 
-        # Запускаем игровой цикл
-        result = self.game_logic.main()
-
-        # Восстанавливаем экран меню
-        self.screen.blit(saved_screen, (0, 0))
-        pygame.display.flip()
-
-        # Обновляем состояние программы
-        if result == "MenuMainStep":
-            self.state.program_step = "MenuMainStep"
-        elif result == "Restart":
-            self.start_game()
+        # Окно меню; его размер меняется, только если игра его меняла
+        self.screen = Startup.window((SCREEN_WIDTH, SCREEN_HEIGHT), 'Игра "Сапёр"')
+        self.rendered_step = None
+        self.display.invalidate()
+        self.state.program_step = "MenuMainStep"
 
     def update_rules_screen(self):
         """Обновление экрана с правилами"""
@@ -280,6 +297,12 @@ class MinesweeperGame:
             # Игровой процесс рендерится в GameLogic
             return
 
+        if self.state.program_step != self.rendered_step:
+            self.rendered_step = self.state.program_step
+            self.display.invalidate()
+        if not self.display:
+            return
+
         self.screen.blit(self.ui.background, (0, 0))
 
         if self.state.program_step == "MenuMainStep":
@@ -291,7 +314,7 @@ class MinesweeperGame:
         elif self.state.program_step == "RecordsStep":
             self.render_records_screen()
 
-        pygame.display.flip()
+        self.display.flush()
 
     def render_main_menu(self):
         """Отрисовка главного меню"""
@@ -317,60 +340,22 @@ class MinesweeperGame:
             self.ui.draw_button(self.screen, 0, y, BUTTON_WIDTH, BUTTON_HEIGHT, data["name"])
 
         self.ui.draw_button(self.screen, 0, 280, BUTTON_WIDTH, BUTTON_HEIGHT, "Свой")
+        no_guess = "вкл" if self.state.no_guess else "выкл"
+        self.ui.draw_button(self.screen, NO_GUESS_X, 100, NO_GUESS_WIDTH, BUTTON_HEIGHT,
+                            f"Без угадывания: {no_guess}")
         self.ui.draw_button(self.screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
 
     def render_rules_screen(self):
         """Отрисовка экрана с правилами"""
         self.ui.draw_title(self.screen, "Правила игры:", 0, 20, 250, 60)
-
-        overlay = pygame.Surface((560, 240), pygame.SRCALPHA)
-        overlay.fill(SEMI_TRANSPARENT_WHITE)
-        self.screen.blit(overlay, (0, 80))
-
-        try:
-            with open(RULES_FILE, 'r', encoding='utf-8') as f:
-                rules = f.read().split('\n')
-        except:
-            rules = ["Файл с правилами не найден"]
-
-        y = 120
-        for line in rules:
-            text = self.ui.fonts["text"].render(line, True, BLACK)
-            self.screen.blit(text, (40, y))
-            y += 20
-
+        # Текст правил собран в готовую панель, файл читается только после изменения
+        self.screen.blit(ContentCache.get_content().rules_panel(RULES_FILE), ContentCache.PANEL_POS)
         self.ui.draw_button(self.screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
 
     def render_records_screen(self):
         """Отрисовка экрана с рекордами"""
         self.ui.draw_title(self.screen, "Рекорды:", 0, 20, 250, 60)
-
-        overlay = pygame.Surface((560, 240), pygame.SRCALPHA)
-        overlay.fill(SEMI_TRANSPARENT_WHITE)
-        self.screen.blit(overlay, (0, 80))
-
-        try:
-            with open(RECORDS_FILE, 'r', encoding='utf-8') as f:
-                records = []
-                for _ in range(3):
-                    name = f.readline().strip()
-                    score = f.readline().strip()
-                    records.append((name, score))
-        except:
-            records = [("Нет данных", "0")] * 3
-
-        level_names = ["Новичок", "Любитель", "Профессионал"]
-        y = 120
-        for i, (name, score) in enumerate(records):
-            if score != "0":
-                text = f"{level_names[i]}: {name} {score}сек."
-            else:
-                text = f"{level_names[i]}: рекорда нет"
-
-            rendered = self.ui.fonts["records"].render(text, True, BLACK)
-            self.screen.blit(rendered, (40, y))
-            y += 60
-
+        self.screen.blit(ContentCache.get_content().records_panel(), ContentCache.PANEL_POS)
         self.ui.draw_button(self.screen, 0, 340, BUTTON_WIDTH, BUTTON_HEIGHT, "Назад")
 
 
@@ -0,0 +1,210 @@
+import random
+
+from Board import Board, NEIGHBOURS
+
+# Состояния партии
+STATUS_READY = "Ready"  # мины еще не расставлены, ждем первый ход
+STATUS_PLAYING = "Playing"
+STATUS_WON = "Won"
+STATUS_LOST = "Lost"
+
+# Коды ходов (используются и в файлах повторов)
+ACTION_REVEAL = 0
+ACTION_FLAG = 1
+ACTION_UNFLAG = 2
+ACTION_CHORD = 3
+
+# Версии генератора поля: 1 - мины ставятся сразу с учетом первого хода,
+# 2 - поле-кандидат по зерну, из которого убираются мины безопасной зоны
+GENERATOR_LEGACY = 1
+GENERATOR = 2
+
+
+def random_seed() -> int:
+    return random.randrange(1, 1000000000)
+
+
+def candidate_board(width: int, height: int, mines: int, seed: int) -> Board:
+    """Первая фаза генерации: поле по зерну без учета первого хода
+
+    Не зависит от клика, поэтому может готовиться заранее в другом потоке.
+    """
+    board = Board(width, height)
+    board.place_mines(mines, (), random.Random(seed))
+    board.compute_nearby()
+    board.build_regions()
+    return board
+
+
+class GameEngine:
+    """Правила игры без графики
+
+    Движок не импортирует pygame, поэтому партии можно играть в тестах,
+    ботах и бенчмарках без дисплея. Отрисовка подписывается на события
+    через subscribe(): у слушателя вызываются необязательные методы
+    on_board_reset(), on_board_generated(), on_move(action, i, j),
+    on_cells_opened(cells), on_flag_changed(i, j, flag) и
+    on_status_changed(status).
+
+    Расстановка мин однозначно задается зерном и первым ходом, поэтому
+    партию можно воспроизвести по записанным ходам.
+    """
+
+    def __init__(self, width: int, height: int, mines: int, safe_zone: bool = True,
+                 seed: int = None, generator: int = GENERATOR):
+        self.width = width
+        self.height = height
+        self.mines = mines
+        # Не ставить мины в квадрат 3x3 вокруг первого хода
+        self.safe_zone = safe_zone
+        self.seed = seed or random_seed()
+        self.generator = generator
+        # Заранее подготовленное поле-кандидат: (зерно, задача с результатом Board)
+        self.candidate = None
+        self.board = self._create_board()
+        self.status = STATUS_READY
+        self.listeners = []
+
+    def _create_board(self):
+        return Board(self.width, self.height)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def _emit(self, event: str, *args):
+        for listener in self.listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(*args)
+
+    def _set_status(self, status: str):
+        self.status = status
+        self._emit("on_status_changed", status)
+
+    def new_board(self, seed: int = None):
+        """Новая партия на том же поле, по умолчанию с новым зерном"""
+        self.seed = seed or random_seed()
+        if self.candidate is not None and self.candidate[0] != self.seed:
+            self.candidate = None
+        self.board.reset()
+        self.status = STATUS_READY
+        self._emit("on_board_reset")
+
+    def use_candidate(self, seed: int, future):
+        """Поле-кандидат для зерна seed, которое готовится в фоне"""
+        self.candidate = (seed, future)
+
+    def _generate(self, i: int, j: int):
+        """Расстановка мин с учетом первого хода
+
+        Кандидат по зерну берется готовым, если он был подготовлен заранее,
+        а на первом ходе из безопасной зоны только переставляются мины, так
+        что задержка не зависит от размера поля.
+        """
+        if self.safe_zone:
+            excluded = self.board.safe_zone(i, j, self.mines)
+        else:
+            excluded = [(i, j)]
+
+        if self.generator == GENERATOR_LEGACY:
+            self.mines = self.board.place_mines(self.mines, excluded, random.Random(self.seed))
+            self.board.compute_nearby()
+            self.board.build_regions()
+        else:
+            if self.candidate is not None and self.candidate[0] == self.seed:
+                candidate = self.candidate[1].result()
+            else:
+                candidate = candidate_board(self.width, self.height, self.mines, self.seed)
+            self.candidate = None
+            self.board.adopt(candidate)
+            self.mines = self.board.clear_zone(excluded, random.Random(f"{self.seed}:{i}:{j}"))
+        self.status = STATUS_PLAYING
+        self._emit("on_board_generated")
+
+    def can_reveal(self, i: int, j: int) -> bool:
+        return (self.status in (STATUS_READY, STATUS_PLAYING) and self.board.inside(i, j) and
+                not self.board.is_opened(i, j) and not self.board.is_flag(i, j))
+
+    def reveal(self, i: int, j: int) -> list:
+        """Ход в клетку, возвращает список открытых клеток"""
+        if not self.can_reveal(i, j):
+            return []
+        self._emit("on_move", ACTION_REVEAL, i, j)
+        if self.status == STATUS_READY:
+            self._generate(i, j)
+        return self._open_cells([(i, j)])
+
+    def chord(self, i: int, j: int) -> list:
+        """Открытие всех соседей числа, вокруг которого уже стоят все флаги"""
+        board = self.board
+        if (self.status != STATUS_PLAYING or not board.inside(i, j) or
+                not board.is_opened(i, j) or not board.nearby_mines(i, j)):
+            return []
+
+        neighbours = [(i + di, j + dj) for di, dj in NEIGHBOURS if board.inside(i + di, j + dj)]
+        if sum(board.is_flag(ni, nj) for ni, nj in neighbours) != board.nearby_mines(i, j):
+            return []
+        self._emit("on_move", ACTION_CHORD, i, j)
+        return self._open_cells([(ni, nj) for ni, nj in neighbours
+                                 if not board.is_opened(ni, nj) and not board.is_flag(ni, nj)])
+
+    def _open_cells(self, targets: list) -> list:
+        """Открывает клетки одной пачкой и проверяет конец партии"""
+        board = self.board
+        opened = []
+        hit_mine = False
+        for i, j in targets:
+            if board.is_mine(i, j):
+                hit_mine = True
+            else:
+                opened.extend(board.reveal(i, j))
+
+        if opened:
+            self._emit("on_cells_opened", opened)
+        if hit_mine:
+            self._set_status(STATUS_LOST)
+        elif self.is_cleared():
+            self._set_status(STATUS_WON)
+        return opened
+
+    def is_cleared(self) -> bool:
+        """Открыты все клетки без мин"""
+        return self.board.opened_count == self.width * self.height - self.mines
+
+    def flag(self, i: int, j: int) -> bool:
+        board = self.board
+        if (self.status not in (STATUS_READY, STATUS_PLAYING) or not board.inside(i, j) or
+                board.is_opened(i, j) or board.is_flag(i, j)):
+            return False
+        self._emit("on_move", ACTION_FLAG, i, j)
+        board.set_flag(i, j)
+        self._emit("on_flag_changed", i, j, True)
+        return True
+
+    def unflag(self, i: int, j: int) -> bool:
+        board = self.board
+        if not board.inside(i, j) or not board.is_flag(i, j):
+            return False
+        self._emit("on_move", ACTION_UNFLAG, i, j)
+        board.delete_flag(i, j)
+        self._emit("on_flag_changed", i, j, False)
+        return True
+
+    def apply(self, action: int, i: int, j: int):
+        """Выполнение хода по его коду"""
+        if action == ACTION_REVEAL:
+            return self.reveal(i, j)
+        elif action == ACTION_FLAG:
+            return self.flag(i, j)
+        elif action == ACTION_UNFLAG:
+            return self.unflag(i, j)
+        elif action == ACTION_CHORD:
+            return self.chord(i, j)
+        raise ValueError(f"Неизвестный ход: {action}")
+
+    def remaining_mines(self) -> int:
+        return self.mines - self.board.flags_count()
+
+    def is_over(self) -> bool:
+        return self.status in (STATUS_WON, STATUS_LOST)
+
@@ -2,13 +2,15 @@ import pygame
 import sys
 from typing import Tuple, Optional
 
-# Инициализация Pygame
-pygame.init()
-pygame.font.init()
+import Assets
+import Fonts
+import Startup
+from GlobalConstants import MAX_FIELD_SIDE, HUGE_BOARD_CELLS
+from InfiniteBoard import min_mines
 
 # Константы
 WINDOW_WIDTH = 350
-WINDOW_HEIGHT = 340
+WINDOW_HEIGHT = 420
 TEXT_PADDING = 20
 BACKGROUND_SRC = "background.png"
 FPS = 60
@@ -33,29 +35,42 @@ class IntRange:
         return self.min <= value <= self.max
 
 
+def mines_range(width: int, height: int) -> IntRange:
+    """Допустимое число мин; огромное поле с более редкими минами не построить"""
+    if width * height > HUGE_BOARD_CELLS:
+        return IntRange(min_mines(width, height), width * height - 1)
+    return IntRange(1, width * height - 1)
+
+
 def draw_title(surface: pygame.Surface, text: str, x: int, y: int, width: int, height: int):
-    font = pygame.font.SysFont('Arial', 24)
+    font = Fonts.font(24)
     text_surface = font.render(text, True, BLACK)
     text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
     surface.blit(text_surface, text_rect)
 
 
 def display_input_field(surface: pygame.Surface, title: str, current_value: int,
-                        input_range: IntRange, x: int, y: int) -> Optional[int]:
+                        input_range: IntRange, x: int, y: int, active: bool = True) -> Optional[int]:
     global USER_INPUT, IS_USER_INPUT_DONE, current_input_field
 
-    font = pygame.font.SysFont('Arial', 15)
-    small_font = pygame.font.SysFont('Arial', 9)
+    font = Fonts.font(15)
+    small_font = Fonts.font(9)
 
     # Отрисовка заголовка
     title_surface = font.render(title, True, BLACK)
     surface.blit(title_surface, (TEXT_PADDING, y))
 
     # Отрисовка поля ввода
-    input_rect = pygame.Rect(x, y, 60, 20)
+    input_rect = pygame.Rect(x, y, 80, 20)
     pygame.draw.rect(surface, WHITE, input_rect)
     pygame.draw.rect(surface, BLACK, input_rect, 1)
 
+    # Неактивное поле показывает уже принятое значение
+    if not active:
+        value_surface = font.render(str(current_value), True, BLACK)
+        surface.blit(value_surface, (x + 5, y))
+        return None
+
     # Отрисовка текущего значения
     value_surface = font.render(USER_INPUT, True, BLACK)
     surface.blit(value_surface, (x + 5, y))
@@ -79,41 +94,43 @@ def display_input_field(surface: pygame.Surface, title: str, current_value: int,
                 pygame.display.flip()
                 pygame.time.delay(1500)
                 USER_INPUT = ""
+                IS_USER_INPUT_DONE = False
                 return None
         except ValueError:
             USER_INPUT = ""
+            IS_USER_INPUT_DONE = False
             return None
 
     return None
 
 
-def display_game_level_form() -> Tuple[int, int, int, int]:
+def display_game_level_form() -> Tuple[int, int, int, int, Optional[int]]:
     global USER_INPUT, IS_USER_INPUT_DONE, current_input_field
 
     # Настройки окна
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-    pygame.display.set_caption("Настройки уровня игры")
+    screen = Startup.window((WINDOW_WIDTH, WINDOW_HEIGHT), "Настройки уровня игры")
 
     # Загрузка фона
-    try:
-        background = pygame.image.load(BACKGROUND_SRC)
-        background = pygame.transform.scale(background, (WINDOW_WIDTH, WINDOW_HEIGHT))
-    except:
-        background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        background.fill(WHITE)
+    background = Assets.get_assets().scaled(BACKGROUND_SRC, (WINDOW_WIDTH, WINDOW_HEIGHT))
 
     # Параметры игры
     game_level = 3  # Пользовательский уровень
     field_width = 10
     field_height = 10
     field_mines_count = 10
+    seed = 0  # 0 - случайное зерно
 
     # Координаты полей ввода
     input_fields = [
-        ("Ширина поля (max 34):", IntRange(1, 34), 260, 120),
-        ("Высота поля (5...19):", IntRange(5, 19), 260, 200),
-        ("Количество мин:", IntRange(1, field_width * field_height - 1), 260, 280)
+        # Поле больше окна прокручивается, огромное строится кусками
+        ("Ширина поля (1...100000):", IntRange(1, MAX_FIELD_SIDE), 260, 120),
+        ("Высота поля (5...100000):", IntRange(5, MAX_FIELD_SIDE), 260, 200),
+        ("Количество мин:", mines_range(field_width, field_height), 260, 280),
+        ("Зерно (0 - случайное):", IntRange(0, 999999999), 220, 360)
     ]
+    values = [field_width, field_height, field_mines_count, seed]
+    # Поля заполняются по очереди, Enter переводит к следующему
+    active_field = 0
 
     clock = pygame.time.Clock()
     running = True
@@ -129,7 +146,7 @@ def display_game_level_form() -> Tuple[int, int, int, int]:
                     title, input_range, x, y = current_input_field
 
                     # Обработка цифр
-                    if event.unicode.isdigit() and len(USER_INPUT) < 2:
+                    if event.unicode.isdigit() and len(USER_INPUT) < len(str(input_range.max)):
                         USER_INPUT += event.unicode
 
                     # Обработка Backspace
@@ -152,52 +169,48 @@ def display_game_level_form() -> Tuple[int, int, int, int]:
         draw_title(screen, "Настройки уровня:", 0, 20, 270, 60)
 
         # Отрисовка полей ввода
-        result_width = display_input_field(screen, *input_fields[0])
-        if result_width is not None:
-            field_width = result_width
+        for index, field in enumerate(input_fields):
+            result = display_input_field(screen, field[0], values[index], *field[1:],
+                                         active=index == active_field)
+            if result is None:
+                continue
+            values[index] = result
+            active_field += 1
             # Обновляем диапазон для мин
-            input_fields[2] = ("Количество мин:", IntRange(1, field_width * field_height - 1), 260, 280)
+            input_fields[2] = ("Количество мин:", mines_range(values[0], values[1]), 260, 280)
 
-        result_height = display_input_field(screen, *input_fields[1])
-        if result_height is not None:
-            field_height = result_height
-            # Обновляем диапазон для мин
-            input_fields[2] = ("Количество мин:", IntRange(1, field_width * field_height - 1), 260, 280)
-
-        result_mines = display_input_field(screen, *input_fields[2])
-        if result_mines is not None:
-            field_mines_count = result_mines
+        # На огромном поле меньше мин не бывает - предупреждаем до ввода, а не подменяем число
+        if active_field == 2 and input_fields[2][1].min > 1:
+            hint = Fonts.font(9).render(f"Огромное поле: не меньше {input_fields[2][1].min} мин", True, BLACK)
+            screen.blit(hint, (TEXT_PADDING, 320))
 
-            # Если все поля заполнены корректно, запускаем обратный отсчет
-            if all(field[0] == "Количество мин:" or
-                   (field[0] == "Ширина поля (max 34):" and field_width is not None) or
-                   (field[0] == "Высота поля (5...19):" and field_height is not None)
-                   for field in input_fields):
+        if active_field == len(input_fields):
+            field_width, field_height, field_mines_count, seed = values
 
-                # Обратный отсчет
-                countdown_font = pygame.font.SysFont('Arial', 30)
-                for i in range(3, 0, -1):
-                    screen.blit(background, (0, 0))
-                    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT - 80), pygame.SRCALPHA)
-                    overlay.fill((255, 255, 255, 230))
-                    screen.blit(overlay, (0, 80))
+            # Обратный отсчет
+            countdown_font = Fonts.font(30)
+            for i in range(3, 0, -1):
+                screen.blit(background, (0, 0))
+                overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT - 80), pygame.SRCALPHA)
+                overlay.fill((255, 255, 255, 230))
+                screen.blit(overlay, (0, 80))
 
-                    countdown_text = countdown_font.render(str(i), True, BLACK)
-                    countdown_rect = countdown_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-                    screen.blit(countdown_text, countdown_rect)
+                countdown_text = countdown_font.render(str(i), True, BLACK)
+                countdown_rect = countdown_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+                screen.blit(countdown_text, countdown_rect)
 
-                    pygame.display.flip()
-                    pygame.time.delay(1000)
+                pygame.display.flip()
+                pygame.time.delay(1000)
 
-                running = False
+            running = False
 
         pygame.display.flip()
         clock.tick(FPS)
 
-    return game_level, field_width, field_height, field_mines_count
+    return game_level, field_width, field_height, field_mines_count, seed or None
 
 
 if __name__ == "__main__":
-    game_level, width, height, mines = display_game_level_form()
-    print(f"Уровень: {game_level}, Ширина: {width}, Высота: {height}, Мины: {mines}")
+    game_level, width, height, mines, seed = display_game_level_form()
+    print(f"Уровень: {game_level}, Ширина: {width}, Высота: {height}, Мины: {mines}, Зерно: {seed}")
     pygame.quit()
\ No newline at end of file
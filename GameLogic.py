@@ -1,8 +1,24 @@
 import pygame
-import random
 import time
 import os
-from typing import List, Dict, Tuple, Optional, Callable
+import numpy as np
+from typing import Optional
+
+from GameEngine import GameEngine, random_seed, STATUS_READY, STATUS_PLAYING, STATUS_WON, STATUS_LOST
+from DirtyRects import DirtyRects
+from Replay import ReplayWriter
+from Solver import Solver
+from Probability import ProbabilityEngine
+from Board import MINE, OPENED, FLAG
+from InfiniteBoard import InfiniteEngine, MIN_DENSITY
+from Viewport import Viewport
+import Records
+import Assets
+import Fonts
+import Startup
+from GlobalConstants import HUGE_BOARD_CELLS
+import NoGuess
+import Pregen
 
 # Constants
 SYMBOL_MINE = '¤'
@@ -11,6 +27,27 @@ WIDTH_CELL = 39
 TEXT_PADDING = 20
 BACKGROUND_SRC = "background.png"
 DEBUG_MODE = False
+# Keep the whole 3x3 block around the first click free of mines
+FIRST_CLICK_SAFE_ZONE = True
+# How often the game loop wakes up without input to redraw the clock
+CLOCK_INTERVAL_MS = 1000
+# Time budget of the probability engine when the hint has to guess
+HINT_TIME_BUDGET = 0.05
+# Room the window leaves on the desktop for its frame and the taskbar
+WINDOW_MARGIN = 80
+# Used when the desktop size is unknown
+DESKTOP_FALLBACK = (1280, 800)
+# Mouse travel in pixels after which a press on a scrollable field becomes a drag
+DRAG_THRESHOLD = 5
+# Arrow keys move the view by this many cells
+PAN_STEP = 3
+# A cascade larger than this redraws the whole view instead of cell by cell
+VIEW_REDRAW_CELLS = 256
+# Below this cell size numbers and symbols turn into colored marks
+MIN_TEXT_CELL = 12
+# Mouse buttons: the right one sets flags, the middle one (or left and right together) chords
+FLAG_BUTTON = 3
+CHORD_BUTTON = 2
 
 # Colors
 clLightGray = (200, 200, 200)
@@ -27,13 +64,57 @@ clOrangeRed = (255, 69, 0)
 clLightGreen = (144, 238, 144)
 clIndianRed = (205, 92, 92)
 
+# Colors of the nearby mines numbers
+NUMBER_COLORS = {
+    1: clGreen,
+    2: clBlue,
+    3: clViolet,
+    4: clDarkViolet,
+    5: clMediumVioletRed,
+    6: clRed,
+    7: clDarkRed,
+    8: clOrangeRed
+}
+
+
+class GlyphCache:
+    """Rendered text surfaces keyed by (text, color, font)"""
+
+    MAX_SIZE = 512
+
+    def __init__(self):
+        self.surfaces = {}
+
+    def get(self, text, color, font):
+        key = (text, color, font)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            # Free-form text (timer, player name) must not grow the cache forever
+            if len(self.surfaces) >= self.MAX_SIZE:
+                self.surfaces.clear()
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+        return surface
+
+    def preload(self, font):
+        """Render the number, flag and mine glyphs for a font once"""
+        for number, color in NUMBER_COLORS.items():
+            self.get(str(number), color, font)
+        self.get(SYMBOL_FLAG, clRed, font)
+        self.get(SYMBOL_MINE, clBlack, font)
+
 
 class GameLogic:
-    def __init__(self, field_width: int, field_height: int, field_mines_count: int):
+    def __init__(self, field_width: int, field_height: int, field_mines_count: int,
+                 seed: Optional[int] = None, no_guess: bool = False):
         """Initialize game with given parameters"""
         self.FIELD_WIDTH = field_width
         self.FIELD_HEIGHT = field_height
         self.FIELD_MINES_COUNT = field_mines_count
+        # Serve boards that the solver finishes without guessing
+        self.no_guess = no_guess
+        # Whether the current board really came from the no-guess pool
+        self.guess_free = False
 
         # Game variables
         self.PROGRAM_STEP = "GameStep"
@@ -44,21 +125,54 @@ class GameLogic:
         self.IS_USER_INPUT_DONE = False
         self.USER_INPUT = ""
 
-        # Field structure
-        self.FIELD = [[self.Cell() for _ in range(self.FIELD_HEIGHT + 2)]
-                      for _ in range(self.FIELD_WIDTH + 2)]
-
-        # Initialize pygame
-        pygame.init()
-        pygame.font.init()
-        self.font_small = pygame.font.SysFont('Arial', 10)
-        self.font_medium = pygame.font.SysFont('Arial', 15)
-        self.font_large = pygame.font.SysFont('Arial', 20)
-        self.font_xlarge = pygame.font.SysFont('Arial', 25)
-        self.font_xxlarge = pygame.font.SysFont('Arial', 30)
+        # Fields too big for arrays are built chunk by chunk as the player gets there
+        self.huge = self.FIELD_WIDTH * self.FIELD_HEIGHT > HUGE_BOARD_CELLS
+        if self.huge:
+            # The level form does not allow fewer mines; other callers get the minimum density,
+            # and the side panel shows the mine count actually used
+            density = max(MIN_DENSITY, self.FIELD_MINES_COUNT / (self.FIELD_WIDTH * self.FIELD_HEIGHT))
+            self.engine = InfiniteEngine(self.FIELD_WIDTH, self.FIELD_HEIGHT, density, seed)
+            self.FIELD_MINES_COUNT = self.engine.mines
+        else:
+            # The board candidate for the seed is built in a background thread before the first click
+            pregen = Pregen.get_pregenerator()
+            seed, candidate = pregen.take(self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT, seed)
+            # And one more right away, for a restart
+            pregen.prepare(self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT)
+
+            # Game rules live in the engine, this class only draws its events
+            self.engine = GameEngine(self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT,
+                                     FIRST_CLICK_SAFE_ZONE, seed)
+            self.engine.use_candidate(seed, candidate)
+        self.engine.subscribe(self)
+        # Every move goes to a binary replay log (the chunked board has no replay format)
+        self.replay = None if self.huge else ReplayWriter(self.engine)
+        # Deterministic solver behind the hint key
+        self.solver = Solver(self.engine.board)
+        self.engine.subscribe(self.solver)
+        # Mine probabilities for the hint when nothing is certain
+        self.probability = None if self.huge else ProbabilityEngine(self.engine.board, self.FIELD_MINES_COUNT)
+        self.FIELD = self.engine.board
+        # Part of the field shown in the window, created with the window
+        self.viewport = None
+        # Pressed mouse button on a scrollable field: (position, button), resolved on release
+        self.press = None
+        self.drag_pos = None
+        self.dragged = False
+        # Mouse buttons held down, to catch both buttons pressed together
+        self.buttons_down = set()
+        self.chording = False
+
+        # Fonts come from the shared registry, pygame itself is started with the window
+        self.font_small = Fonts.font(10)
+        self.font_medium = Fonts.font(15)
+        self.font_large = Fonts.font(20)
+        self.font_xlarge = Fonts.font(25)
+        self.font_xxlarge = Fonts.font(30)
+        self.glyphs = GlyphCache()
+        self.glyphs.preload(self.font_medium)
 
         # Game state
-        self.fcount = 0
         self.xtemp = 0
         self.ytemp = 0
         self.time0 = 0
@@ -69,31 +183,26 @@ class GameLogic:
         self.windowCenterX = 0
         self.windowCenterY = 0
         self.screen = None
+        self.display = DirtyRects()
+        self.shown_time = None
 
-    class Cell:
-        def __init__(self):
-            self.mine = False
-            self.opened = False
-            self.flag = False
-            self.nearbyMines = 0
-
-    def main(self):
-        """Main game loop"""
-        self.display_game_step()
-        pygame.quit()
+        # CPU and wall time spent blocked in pygame.event.wait
+        self.idle_cpu_time = 0.0
+        self.idle_wall_time = 0.0
 
     def set_window_size(self, width, height):
         self.windowWidth = width
         self.windowHeight = height
-        self.screen = pygame.display.set_mode((self.windowWidth, self.windowHeight))
-        pygame.display.set_caption("Minesweeper")
+        # A restart keeps the window, it is resized only for another field size
+        self.screen = Startup.window((self.windowWidth, self.windowHeight), "Minesweeper")
+        self.display.invalidate()
 
     def center_window(self):
         os.environ['SDL_VIDEO_CENTERED'] = '1'
 
     def draw_text_centered(self, text, x, y, width, height, color=clBlack, font=None):
         font = font or self.font_medium
-        text_surface = font.render(text, True, color)
+        text_surface = self.glyphs.get(text, color, font)
         text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
         self.screen.blit(text_surface, text_rect)
 
@@ -106,6 +215,7 @@ class GameLogic:
         overlay = pygame.Surface((self.windowWidth, self.windowHeight), pygame.SRCALPHA)
         overlay.fill((255, 255, 255, 200))
         self.screen.blit(overlay, (0, 0))
+        self.display.invalidate()
 
     def alert(self, message=""):
         vertical_padding = 0
@@ -122,143 +232,181 @@ class GameLogic:
                          self.windowCenterX + 100, self.windowCenterY + vertical_padding + 20,
                          "Продолжить", clLightGreen)
 
-        pygame.display.flip()
+        self.display.flush()
 
         waiting = True
         while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    button = event.button
-
-                    if (self.windowCenterX - 100 <= mouse_x <= self.windowCenterX + 100 and
-                            self.windowCenterY + vertical_padding - 20 <= mouse_y <= self.windowCenterY + vertical_padding + 20 and
-                            button == 1):
-                        waiting = False
-                        self.IS_MOUSE_DOWN = False
-
-            pygame.time.delay(1)
+            event = self.wait_event()
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_x, mouse_y = event.pos
+                button = event.button
+
+                if (self.windowCenterX - 100 <= mouse_x <= self.windowCenterX + 100 and
+                        self.windowCenterY + vertical_padding - 20 <= mouse_y <= self.windowCenterY + vertical_padding + 20 and
+                        button == 1):
+                    waiting = False
+                    self.IS_MOUSE_DOWN = False
 
         self.screen.blit(saved_screen, (0, 0))
+        self.display.invalidate()
         self.MOUSE_X, self.MOUSE_Y = 0, 0
+        # Releases of the buttons were consumed here
+        self.buttons_down.clear()
 
-    def fill_field(self):
-        count = 0
-        while count < self.FIELD_MINES_COUNT:
-            i = random.randint(1, self.FIELD_WIDTH)
-            j = random.randint(1, self.FIELD_HEIGHT)
-
-            if not self.FIELD[i][j].mine and not self.FIELD[i][j].opened:
-                self.FIELD[i][j].mine = True
-                count += 1
-
-                if DEBUG_MODE:
-                    self.draw_text_centered(SYMBOL_MINE, 39 * i, 39 * j, 39, 39,
-                                            clBlack, self.font_medium)
-
-    def setup_field(self):
-        for i in range(1, self.FIELD_WIDTH + 1):
-            for j in range(1, self.FIELD_HEIGHT + 1):
-                if not self.FIELD[i][j].mine:
-                    k = 0
-                    # Check all 8 surrounding cells
-                    for di in [-1, 0, 1]:
-                        for dj in [-1, 0, 1]:
-                            if di == 0 and dj == 0:
-                                continue
-                            ni, nj = i + di, j + dj
-                            if 1 <= ni <= self.FIELD_WIDTH and 1 <= nj <= self.FIELD_HEIGHT and self.FIELD[ni][nj].mine:
-                                k += 1
-                    self.FIELD[i][j].nearbyMines = k
-
-    def open_cell(self, i, j):
-        self.FIELD[i][j].opened = True
-        self.fcount += 1
-
-        pygame.draw.rect(self.screen, clWhite, (39 * i + 2, 39 * j + 2, 35, 35))
-
-        colors = {
-            1: clGreen,
-            2: clBlue,
-            3: clViolet,
-            4: clDarkViolet,
-            5: clMediumVioletRed,
-            6: clRed,
-            7: clDarkRed,
-            8: clOrangeRed
-        }
-
-        if self.FIELD[i][j].nearbyMines > 0:
-            color = colors.get(self.FIELD[i][j].nearbyMines, clBlack)
-            self.draw_text_centered(str(self.FIELD[i][j].nearbyMines), 39 * i, 39 * j,
-                                    39, 39, color, self.font_medium)
-
-    def open_empty_cells(self, i, j):
-        self.open_cell(i, j)
-
-        for di in [-1, 0, 1]:
-            for dj in [-1, 0, 1]:
-                if di == 0 and dj == 0:
-                    continue
-                ni, nj = i + di, j + dj
-                if 1 <= ni <= self.FIELD_WIDTH and 1 <= nj <= self.FIELD_HEIGHT and not self.FIELD[ni][nj].opened:
-                    if self.FIELD[ni][nj].nearbyMines != 0 and not self.FIELD[ni][nj].flag:
-                        self.open_cell(ni, nj)
-                    elif self.FIELD[ni][nj].nearbyMines == 0 and not self.FIELD[ni][nj].flag:
-                        self.open_empty_cells(ni, nj)
+    def on_board_generated(self):
+        if DEBUG_MODE:
+            self.render_view()
+
+    def on_cells_opened(self, cells):
+        # The engine reports a whole cascade at once, draw it in one pass
+        if len(cells) > VIEW_REDRAW_CELLS:
+            self.render_view()
+            return
+        for ci, cj in cells:
+            self.draw_cell(ci, cj)
+
+    def on_flag_changed(self, i, j, flag):
+        self.draw_cell(i, j)
+
+    def cell_rect(self, i, j):
+        return self.viewport.cell_rect(i, j)
+
+    def cell_inner(self, rect):
+        """Inside of a cell without its frame, scaled with the zoom"""
+        padding = max(1, rect.width * 2 // WIDTH_CELL)
+        return rect.inflate(-2 * padding, -2 * padding)
+
+    def cell_font(self):
+        # At the original scale this is the medium font
+        return Fonts.font(max(6, self.viewport.cell * 15 // WIDTH_CELL))
+
+    def draw_cell_symbol(self, text, rect, color):
+        if rect.width >= MIN_TEXT_CELL:
+            self.draw_text_centered(text, rect.x, rect.y, rect.width, rect.height, color, self.cell_font())
+        else:
+            pygame.draw.rect(self.screen, color, rect.inflate(-rect.width // 2, -rect.height // 2))
+
+    def draw_cell_content(self, i, j, state, nearby):
+        """Number, flag or (in debug mode) mine of a cell whose background is drawn"""
+        rect = self.viewport.cell_rect(i, j)
+        if state & OPENED:
+            if nearby:
+                self.draw_cell_symbol(str(nearby), rect, NUMBER_COLORS.get(nearby, clBlack))
+        elif state & FLAG:
+            self.draw_cell_symbol(SYMBOL_FLAG, rect, clRed)
+        elif DEBUG_MODE and state & MINE and self.engine.status != STATUS_READY:
+            self.draw_cell_symbol(SYMBOL_MINE, rect, clBlack)
+
+    def draw_cell(self, i, j):
+        """Redraw one cell from its state, if it is in view"""
+        if not self.viewport.is_visible(i, j):
+            return
+        rect = self.viewport.cell_rect(i, j)
+        state = int(self.FIELD.state[i, j])
+        self.screen.set_clip(self.viewport.rect)
+        pygame.draw.rect(self.screen, clLightGray, rect)
+        pygame.draw.rect(self.screen, clBlack, rect, 1)
+        if state & OPENED:
+            pygame.draw.rect(self.screen, clWhite, self.cell_inner(rect))
+        self.draw_cell_content(i, j, state, int(self.FIELD.nearby[i, j]))
+        self.screen.set_clip(None)
+        self.display.add(rect.clip(self.viewport.rect))
+
+    def render_view(self):
+        """Redraw the visible part of the field: the cost depends on the window, not on the board"""
+        view = self.viewport
+        i0, i1, j0, j1 = view.visible_range()
+        first, last = view.cell_rect(i0, j0), view.cell_rect(i1, j1)
+        area = pygame.Rect(first.x, first.y, last.right - first.x, last.bottom - first.y)
+
+        self.screen.set_clip(view.rect)
+        self.screen.blit(self.background, view.rect, view.rect)
+        self.screen.fill(clLightGray, area)
+        # Frames of all cells as lines: the left and right edge of every column, same for rows
+        for i in range(i0, i1 + 1):
+            x = view.cell_rect(i, j0).x
+            pygame.draw.line(self.screen, clBlack, (x, area.top), (x, area.bottom - 1))
+            pygame.draw.line(self.screen, clBlack, (x + view.cell - 1, area.top), (x + view.cell - 1, area.bottom - 1))
+        for j in range(j0, j1 + 1):
+            y = view.cell_rect(i0, j).y
+            pygame.draw.line(self.screen, clBlack, (area.left, y), (area.right - 1, y))
+            pygame.draw.line(self.screen, clBlack, (area.left, y + view.cell - 1), (area.right - 1, y + view.cell - 1))
+
+        state, nearby = self.FIELD.window(i0, i1, j0, j1)
+        opened = (state & OPENED) != 0
+        for di, dj in np.argwhere(opened):
+            pygame.draw.rect(self.screen, clWhite, self.cell_inner(view.cell_rect(i0 + di, j0 + dj)))
+        marked = (opened & (nearby > 0)) | ((state & FLAG) != 0)
+        if DEBUG_MODE:
+            marked |= (state & MINE) != 0
+        for di, dj in np.argwhere(marked):
+            self.draw_cell_content(i0 + di, j0 + dj, int(state[di, dj]), int(nearby[di, dj]))
+        self.screen.set_clip(None)
+        self.display.add(view.rect)
+
+    def show_hint(self):
+        """Highlight a cell the solver proved safe, a certain mine or the safest guess"""
+        safe = self.solver.next_safe()
+        if safe:
+            cells, color = safe[:1], clLightGreen
+        else:
+            cells, color = [cell for cell in self.solver.certain_mines()
+                            if not self.FIELD.is_flag(*cell)][:1], clIndianRed
+        timing = self.solver.last_timing
+        if not cells and self.probability is not None and self.engine.status == STATUS_PLAYING:
+            # Nothing is certain, point to the cell least likely to hold a mine
+            self.probability.mines = self.engine.mines
+            result = self.probability.compute(HINT_TIME_BUDGET)
+            state = self.FIELD.state[1:-1, 1:-1]
+            closed = [(int(i) + 1, int(j) + 1) for i, j in zip(*((state & (OPENED | FLAG)) == 0).nonzero())
+                      if (int(i) + 1, int(j) + 1) not in self.solver.mines]
+            if closed:
+                cells, color = [result.best_guess(closed)], clBlue
+            timing += result.elapsed
+        for i, j in cells:
+            # The hinted cell may be out of view on a big field
+            if not self.viewport.is_visible(i, j):
+                self.viewport.center_on(i, j)
+                self.render_view()
+            rect = self.viewport.cell_rect(i, j)
+            self.screen.set_clip(self.viewport.rect)
+            pygame.draw.rect(self.screen, color, self.cell_inner(rect), max(1, rect.width * 3 // WIDTH_CELL))
+            self.screen.set_clip(None)
+            self.display.add(rect.clip(self.viewport.rect))
+        if DEBUG_MODE:
+            print(f"Hint: {timing * 1000:.3f} ms")
 
     def open_first_cell(self, i, j):
         self.time0 = int(time.time() * 1000)
         self.game_time = 0
-        self.FIELD[i][j].opened = True
-        self.FIELD[i][j].mine = False
-
-        self.fill_field()
-        self.setup_field()
-
-        if self.FIELD[i][j].nearbyMines == 0:
-            self.open_empty_cells(i, j)
-
-        pygame.draw.rect(self.screen, clWhite, (39 * i + 2, 39 * j + 2, 35, 35))
-
-        if self.FIELD[i][j].nearbyMines > 0:
-            colors = {
-                1: clGreen,
-                2: clBlue,
-                3: clViolet,
-                4: clDarkViolet,
-                5: clMediumVioletRed,
-                6: clRed,
-                7: clDarkRed,
-                8: clOrangeRed
-            }
-            color = colors.get(self.FIELD[i][j].nearbyMines, clBlack)
-            self.draw_text_centered(str(self.FIELD[i][j].nearbyMines), 39 * i, 39 * j,
-                                    39, 39, color, self.font_medium)
-            self.fcount += 1
-
-    def set_flag(self, i, j):
-        self.FIELD[i][j].flag = True
-        self.draw_text_centered(SYMBOL_FLAG, 39 * i, 39 * j, 39, 39,
-                                clRed, self.font_medium)
-
-    def delete_flag(self, i, j):
-        self.FIELD[i][j].flag = False
-        pygame.draw.rect(self.screen, clLightGray, (39 * i + 2, 39 * j + 2, 35, 35))
-        pygame.draw.rect(self.screen, clWhite, (39 * i + 2, 39 * j + 2, 35, 35))
-
-    def check_buttons_click(self):
-        if self.check_menu_button_click(self.xtemp, self.ytemp, self.BUTTON_TYPE, self.FIELD_WIDTH):
-            self.PROGRAM_STEP = "MenuMainStep"
-        elif self.check_restart_button_click(self.xtemp, self.ytemp, self.BUTTON_TYPE, self.FIELD_WIDTH):
-            self.PROGRAM_STEP = "GameStep"
-        elif self.check_exit_button_click(self.xtemp, self.ytemp, self.BUTTON_TYPE, self.FIELD_HEIGHT,
-                                          self.FIELD_WIDTH):
-            pygame.quit()
-            return
+        if self.no_guess and not self.huge:
+            # The board is fixed by the seed and the first click, so a pooled seed is a ready board
+            start = time.perf_counter()
+            seed = NoGuess.get_pool().first_click_seed(self.FIELD_WIDTH, self.FIELD_HEIGHT,
+                                                       self.FIELD_MINES_COUNT, i, j, FIRST_CLICK_SAFE_ZONE)
+            self.guess_free = seed is not None
+            if seed is not None:
+                self.engine.seed = seed
+                self.draw_board_notice("Без угадывания")
+            else:
+                # Nothing found in time: the game goes on with an ordinary board, and the player is told
+                self.draw_board_notice("Без угадывания не нашлось", clRed)
+            if DEBUG_MODE:
+                print(f"No-guess board: seed {seed}, {(time.perf_counter() - start) * 1000:.1f} ms")
+        start = time.perf_counter()
+        self.engine.reveal(i, j)
+        if DEBUG_MODE:
+            print(f"First click: {(time.perf_counter() - start) * 1000:.3f} ms")
+
+    def draw_board_notice(self, text, color=clBlack):
+        """Note under the seed about what kind of board is being played"""
+        rect = pygame.Rect(self.windowWidth - 200, WIDTH_CELL * 8 + TEXT_PADDING, 200, TEXT_PADDING)
+        self.screen.blit(self.background, rect, rect)
+        self.draw_text_centered(text, rect.x, rect.y, rect.width, rect.height, color, self.font_small)
+        self.display.add(rect)
 
     def check_menu_button_click(self, mouse_x, mouse_y, button_type, field_width):
         return (self.windowWidth - 150 <= mouse_x <= self.windowWidth - 50 and
@@ -280,28 +428,15 @@ class GameLogic:
                 WIDTH_CELL * 3 <= mouse_y <= WIDTH_CELL * 4 and
                 button_type == 1)
 
-    def check_is_best(self, time_val, game_level):
-        class HighScore:
-            def __init__(self):
-                self.name = ""
-                self.score = 0
-
-        players = [HighScore() for _ in range(3)]
+    def check_is_best(self, time_val):
+        """Store the won game and ask for a name if it made the top of its field size"""
+        records = Records.get_records()
+        config = (self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT)
+        is_best = records.is_record(*config, time_val)
+        game_id = records.add_game(*config, self.engine.seed, time_val, True)
         self.IS_USER_INPUT_DONE = False
 
-        # Try to read records file
-        try:
-            with open("records.txt", "r") as f:
-                for i in range(3):
-                    players[i].name = f.readline().strip()
-                    players[i].score = int(f.readline().strip())
-        except FileNotFoundError:
-            # Create default records if file doesn't exist
-            for i in range(3):
-                players[i].name = "Anonymous"
-                players[i].score = 0
-
-        if players[game_level].score == 0 or time_val < players[game_level].score:
+        if is_best:
             self.display_overlay()
             self.draw_text_centered("Новый рекорд!", 0, self.windowCenterY - 100,
                                     self.windowWidth, 40, clBlack, self.font_xxlarge)
@@ -313,46 +448,30 @@ class GameLogic:
             input_active = True
 
             while input_active:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        return
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_RETURN:
-                            input_active = False
-                            self.IS_USER_INPUT_DONE = True
-                        elif event.key == pygame.K_BACKSPACE:
-                            self.USER_INPUT = self.USER_INPUT[:-1]
-                        elif len(self.USER_INPUT) < 15:
-                            self.USER_INPUT += event.unicode
+                event = self.wait_event()
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    return
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN:
+                        input_active = False
+                        self.IS_USER_INPUT_DONE = True
+                    elif event.key == pygame.K_BACKSPACE:
+                        self.USER_INPUT = self.USER_INPUT[:-1]
+                    elif len(self.USER_INPUT) < 15:
+                        self.USER_INPUT += event.unicode
 
                 pygame.draw.rect(self.screen, clWhite,
                                  (self.windowCenterX - 100, self.windowCenterY, 200, 40))
                 self.draw_text_centered(self.USER_INPUT, self.windowCenterX - 100,
                                         self.windowCenterY, 200, 40, clBlack, self.font_large)
-                pygame.display.flip()
-
-            players[game_level].name = self.USER_INPUT
-            players[game_level].score = time_val
+                self.display.add((self.windowCenterX - 100, self.windowCenterY, 200, 40))
+                self.display.flush()
 
-            with open("records.txt", "w") as f:
-                for i in range(3):
-                    f.write(f"{players[i].name}\n")
-                    f.write(f"{players[i].score}\n")
+            records.set_name(game_id, self.USER_INPUT)
 
         self.PROGRAM_STEP = "MenuMainStep"
 
-    def display_win(self):
-        self.time1 = int(time.time() * 1000)
-        self.game_time += (self.time1 - self.time0) // 1000 + 1
-
-        self.alert(f"Победа! Время прохождения: {self.game_time} сек.")
-
-        if self.GAME_LEVEL != 3:
-            self.check_is_best(self.game_time, self.GAME_LEVEL)
-        else:
-            self.PROGRAM_STEP = "MenuMainStep"
-
     def pause(self):
         self.time1 = int(time.time() * 1000)
         self.game_time += (self.time1 - self.time0) // 1000 + 1
@@ -363,92 +482,145 @@ class GameLogic:
         self.time1 = int(time.time() * 1000)
         self.game_time += (self.time1 - self.time0) // 1000 + 1
         self.alert(f"Вы проиграли потратив {self.game_time} секунд(ы)...")
-        # Закрываем игровое окно
-        pygame.display.quit()
+        if not self.huge:
+            Records.get_records().add_game(self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT,
+                                           self.engine.seed, self.game_time, False)
         return "MenuMainStep"
 
     def display_win(self):
         self.time1 = int(time.time() * 1000)
         self.game_time += (self.time1 - self.time0) // 1000 + 1
         self.alert(f"Победа! Время прохождения: {self.game_time} сек.")
+        # Records are kept for every field size, custom levels included
+        self.check_is_best(self.game_time)
 
-        if self.GAME_LEVEL != 3:
-            self.check_is_best(self.game_time, self.GAME_LEVEL)
-
-        # Закрываем игровое окно
-        pygame.display.quit()
         return "MenuMainStep"
 
     def check_buttons_click(self):
         if self.check_menu_button_click(self.xtemp, self.ytemp, self.BUTTON_TYPE, self.FIELD_WIDTH):
-            pygame.display.quit()
             return "MenuMainStep"
         elif self.check_restart_button_click(self.xtemp, self.ytemp, self.BUTTON_TYPE, self.FIELD_WIDTH):
-            pygame.display.quit()
             return "Restart"
         elif self.check_exit_button_click(self.xtemp, self.ytemp, self.BUTTON_TYPE, self.FIELD_HEIGHT,
                                           self.FIELD_WIDTH):
             pygame.quit()
             return "Exit"
 
+    def wait_event(self, timeout=0):
+        """Block until the next event, accounting the time spent idle"""
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        event = pygame.event.wait(timeout)
+        self.idle_cpu_time += time.process_time() - cpu_start
+        self.idle_wall_time += time.perf_counter() - wall_start
+        return event
+
+    def idle_cpu_percent(self):
+        """CPU load while the game was waiting for input, in percent of one core"""
+        if self.idle_wall_time == 0:
+            return 0.0
+        return 100.0 * self.idle_cpu_time / self.idle_wall_time
+
+    def current_game_time(self):
+        if self.engine.status == STATUS_READY:
+            return 0
+        return self.game_time + (int(time.time() * 1000) - self.time0) // 1000
+
+    def clock_timeout(self):
+        """Milliseconds until the game time on the clock changes"""
+        if self.engine.status != STATUS_PLAYING:
+            return CLOCK_INTERVAL_MS
+        return CLOCK_INTERVAL_MS - (int(time.time() * 1000) - self.time0) % CLOCK_INTERVAL_MS
+
+    def draw_clock(self):
+        """Redraw the clock if the shown second changed; returns whether it did"""
+        game_time = self.current_game_time()
+        if game_time == self.shown_time:
+            return False
+        self.shown_time = game_time
+
+        rect = pygame.Rect(self.windowWidth - 150, 0, 100, WIDTH_CELL)
+        self.screen.blit(self.background, rect, rect)
+        self.draw_text_centered(f"Время: {game_time}", rect.x, rect.y, rect.width, rect.height)
+        self.display.add(rect)
+        return True
+
     def draw_field(self):
-        for i in range(1, self.FIELD_WIDTH + 1):
-            for j in range(1, self.FIELD_HEIGHT + 1):
-                pygame.draw.rect(self.screen, clLightGray,
-                                 (WIDTH_CELL * i, WIDTH_CELL * j, WIDTH_CELL, WIDTH_CELL))
-                pygame.draw.rect(self.screen, clBlack,
-                                 (WIDTH_CELL * i, WIDTH_CELL * j, WIDTH_CELL, WIDTH_CELL), 1)
-                self.FIELD[i][j].opened = False
-                self.FIELD[i][j].mine = False
-                self.FIELD[i][j].flag = False
+        self.engine.new_board(self.engine.seed)
+        self.render_view()
+
+    def view_size(self):
+        """Size of the field view in pixels: the whole field if it fits on the desktop"""
+        try:
+            desktop_width, desktop_height = pygame.display.get_desktop_sizes()[0]
+        except (AttributeError, IndexError, pygame.error):
+            desktop_width, desktop_height = DESKTOP_FALLBACK
+        if not desktop_width or not desktop_height:
+            desktop_width, desktop_height = DESKTOP_FALLBACK
+        max_width = max(8 * WIDTH_CELL, desktop_width - 240 - WINDOW_MARGIN)
+        max_height = max(8 * WIDTH_CELL, desktop_height - TEXT_PADDING * 2 - WINDOW_MARGIN)
+        return (min(self.FIELD_WIDTH * WIDTH_CELL, max_width),
+                min(self.FIELD_HEIGHT * WIDTH_CELL, max_height))
 
     def check_mine(self, i, j):
         return (1 <= i <= self.FIELD_WIDTH and 1 <= j <= self.FIELD_HEIGHT and
-                self.BUTTON_TYPE == 1 and not self.FIELD[i][j].mine and
-                not self.FIELD[i][j].opened and not self.FIELD[i][j].flag)
+                self.BUTTON_TYPE == 1 and not self.FIELD.is_mine(i, j) and
+                not self.FIELD.is_opened(i, j) and not self.FIELD.is_flag(i, j))
 
     def check_set_flag(self, i, j):
         return (1 <= i <= self.FIELD_WIDTH and 1 <= j <= self.FIELD_HEIGHT and
-                self.BUTTON_TYPE == 2 and not self.FIELD[i][j].flag and
-                not self.FIELD[i][j].opened)
+                self.BUTTON_TYPE == FLAG_BUTTON and not self.FIELD.is_flag(i, j) and
+                not self.FIELD.is_opened(i, j))
 
     def check_delete_flag(self, i, j):
         return (1 <= i <= self.FIELD_WIDTH and 1 <= j <= self.FIELD_HEIGHT and
-                self.BUTTON_TYPE == 2 and self.FIELD[i][j].flag and
-                not self.FIELD[i][j].opened)
+                self.BUTTON_TYPE == FLAG_BUTTON and self.FIELD.is_flag(i, j) and
+                not self.FIELD.is_opened(i, j))
+
+    def check_chord(self, i, j):
+        return (1 <= i <= self.FIELD_WIDTH and 1 <= j <= self.FIELD_HEIGHT and
+                self.BUTTON_TYPE == CHORD_BUTTON and self.FIELD.is_opened(i, j) and
+                self.FIELD.nearby_mines(i, j) > 0)
 
     def check_is_lose(self, i, j):
         return (1 <= i <= self.FIELD_WIDTH and 1 <= j <= self.FIELD_HEIGHT and
-                self.BUTTON_TYPE == 1 and self.FIELD[i][j].mine and
-                not self.FIELD[i][j].flag)
+                self.BUTTON_TYPE == 1 and self.FIELD.is_mine(i, j) and
+                not self.FIELD.is_flag(i, j))
 
     def display_game_step(self):
         # Calculate window size
-        self.windowWidth = self.FIELD_WIDTH * WIDTH_CELL + 240
-        self.windowHeight = self.FIELD_HEIGHT * WIDTH_CELL + TEXT_PADDING * 2
+        view_width, view_height = self.view_size()
+        self.windowWidth = view_width + 240
+        self.windowHeight = view_height + TEXT_PADDING * 2
 
         self.set_window_size(self.windowWidth, self.windowHeight)
         self.center_window()
 
-        # Load background
-        try:
-            background = pygame.image.load(BACKGROUND_SRC)
-            background = pygame.transform.scale(background, (self.windowWidth, self.windowHeight))
-            self.screen.blit(background, (0, 0))
-        except:
-            self.screen.fill(clWhite)
+        # The background is decoded once per process, restarts reuse the scaled copy
+        self.background = Assets.get_assets().scaled(BACKGROUND_SRC, (self.windowWidth, self.windowHeight))
+        self.screen.blit(self.background, (0, 0))
 
         self.windowCenterX = self.windowWidth // 2
         self.windowCenterY = self.windowHeight // 2
 
+        # The field starts one cell from the window corner, as before
+        self.viewport = Viewport((WIDTH_CELL, WIDTH_CELL, view_width, view_height),
+                                 self.FIELD_WIDTH, self.FIELD_HEIGHT)
+        if self.huge:
+            self.viewport.center_on((self.FIELD_WIDTH + 1) // 2, (self.FIELD_HEIGHT + 1) // 2)
+
         # Reset variables
-        self.fcount = 0
         self.i = 0
         self.j = 0
         self.MOUSE_X = 0
         self.MOUSE_Y = 0
         self.xtemp = 0
         self.ytemp = 0
+        self.shown_time = None
+        self.guess_free = False
+        self.press = None
+        self.buttons_down.clear()
+        self.chording = False
 
         # Draw field
         self.draw_field()
@@ -462,72 +634,202 @@ class GameLogic:
                          self.windowWidth - 50, WIDTH_CELL * 6, "Меню")
         self.draw_button(self.windowWidth - 150, WIDTH_CELL * 7,
                          self.windowWidth - 50, WIDTH_CELL * 8, "Выход")
+        self.draw_text_centered(f"Зерно: {self.engine.seed}", self.windowWidth - 150, WIDTH_CELL * 8,
+                                100, TEXT_PADDING, clBlack, self.font_small)
+        if self.huge:
+            # Mines are laid by density, so the count is an expectation
+            self.draw_board_notice(f"Мин: ~{self.FIELD_MINES_COUNT}")
+
+        self.draw_clock()
+        self.display.flush()
+
+        while True:
+            # Sleep until input arrives or the shown second runs out
+            event = self.wait_event(self.clock_timeout())
+            # Steady mouse motion never lets the wait time out, so the clock is checked after any event
+            if self.draw_clock():
+                self.display.flush()
+
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return "Exit"
+
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # The wheel is handled by MOUSEWHEEL
+                if event.button > 3:
+                    continue
+                self.buttons_down.add(event.button)
+                if {1, 3} <= self.buttons_down:
+                    # Both buttons together chord on release, the single-button press is dropped
+                    self.chording = True
+                    self.press = None
+                    continue
+                if self.viewport.scrollable() and self.viewport.rect.collidepoint(event.pos):
+                    # On a scrollable field a press may start a drag, the click happens on release
+                    self.press = (event.pos, event.button)
+                    self.drag_pos = event.pos
+                    self.dragged = False
+                    continue
+                result = self.handle_click(event.pos, event.button)
+                if result:
+                    return result
 
-        pygame.display.flip()
-
+            elif event.type == pygame.MOUSEMOTION:
+                if self.press is None:
+                    continue
+                start_x, start_y = self.press[0]
+                if abs(event.pos[0] - start_x) + abs(event.pos[1] - start_y) >= DRAG_THRESHOLD:
+                    self.dragged = True
+                if self.dragged:
+                    moved = self.viewport.pan(self.drag_pos[0] - event.pos[0], self.drag_pos[1] - event.pos[1])
+                    self.drag_pos = event.pos
+                    if moved:
+                        self.render_view()
+                        self.display.flush()
+
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.buttons_down.discard(event.button)
+                if self.chording:
+                    # The first released button chords, the other one is ignored
+                    self.chording = False
+                    result = self.handle_click(event.pos, CHORD_BUTTON)
+                    if result:
+                        return result
+                    continue
+                if self.press is None or event.button != self.press[1]:
+                    continue
+                press, self.press = self.press, None
+                if not self.dragged:
+                    result = self.handle_click(*press)
+                    if result:
+                        return result
+
+            elif event.type == pygame.MOUSEWHEEL:
+                if self.viewport.zoom(event.y, *pygame.mouse.get_pos()):
+                    self.render_view()
+                    self.display.flush()
+
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_h and self.engine.status != STATUS_READY:
+                    self.show_hint()
+                    self.display.flush()
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+                    step = PAN_STEP * self.viewport.cell
+                    dx = {pygame.K_LEFT: -step, pygame.K_RIGHT: step}.get(event.key, 0)
+                    dy = {pygame.K_UP: -step, pygame.K_DOWN: step}.get(event.key, 0)
+                    if self.viewport.pan(dx, dy):
+                        self.render_view()
+                        self.display.flush()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS,
+                                   pygame.K_MINUS, pygame.K_KP_MINUS):
+                    steps = -1 if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) else 1
+                    if self.viewport.zoom(steps):
+                        self.render_view()
+                        self.display.flush()
+
+    def handle_click(self, pos, button):
+        """Act on a click; returns the next program step when the game is over"""
+        self.MOUSE_X, self.MOUSE_Y = pos
+        self.BUTTON_TYPE = button
+        self.IS_MOUSE_DOWN = True
         is_confirmed = False
-        running = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    pygame.quit()
-                    return "Exit"
-
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.MOUSE_X, self.MOUSE_Y = event.pos
-                    self.BUTTON_TYPE = event.button
-                    self.IS_MOUSE_DOWN = True
-
-                    self.i = self.MOUSE_X // WIDTH_CELL
-                    self.j = self.MOUSE_Y // WIDTH_CELL
-
-                    # First cell opening
-                    if (1 <= self.i <= self.FIELD_WIDTH and 1 <= self.j <= self.FIELD_HEIGHT and
-                            self.BUTTON_TYPE == 1 and self.fcount == 0):
-                        self.open_first_cell(self.i, self.j)
-                    elif self.check_pause_button_click(self.MOUSE_X, self.MOUSE_Y,
-                                                       self.BUTTON_TYPE, self.FIELD_WIDTH):
-                        self.pause()
-                    elif self.check_mine(self.i, self.j):
-                        if self.FIELD[self.i][self.j].nearbyMines != 0:
-                            self.open_cell(self.i, self.j)
-                        else:
-                            self.open_empty_cells(self.i, self.j)
-                    elif self.check_set_flag(self.i, self.j):
-                        self.set_flag(self.i, self.j)
-                    elif self.check_delete_flag(self.i, self.j):
-                        self.delete_flag(self.i, self.j)
-                    elif self.check_restart_button_click(self.MOUSE_X, self.MOUSE_Y,
-                                                         self.BUTTON_TYPE, self.FIELD_WIDTH):
-                        is_confirmed = True
-                    elif self.check_menu_button_click(self.MOUSE_X, self.MOUSE_Y,
-                                                      self.BUTTON_TYPE, self.FIELD_WIDTH):
-                        is_confirmed = True
-                    elif self.check_exit_button_click(self.MOUSE_X, self.MOUSE_Y,
-                                                      self.BUTTON_TYPE, self.FIELD_HEIGHT,
-                                                      self.FIELD_WIDTH):
-                        is_confirmed = True
-
-                    self.IS_MOUSE_DOWN = False
-                    pygame.display.flip()
+        is_changed = False
+
+        # Clicks outside the field map to a cell outside it, like before
+        self.i, self.j = self.viewport.cell_at(self.MOUSE_X, self.MOUSE_Y) or (0, 0)
+
+        # First cell opening
+        if (1 <= self.i <= self.FIELD_WIDTH and 1 <= self.j <= self.FIELD_HEIGHT and
+                self.BUTTON_TYPE == 1 and self.engine.status == STATUS_READY):
+            self.open_first_cell(self.i, self.j)
+            is_changed = True
+        elif self.check_pause_button_click(self.MOUSE_X, self.MOUSE_Y,
+                                           self.BUTTON_TYPE, self.FIELD_WIDTH):
+            self.pause()
+        elif self.check_mine(self.i, self.j) or self.check_is_lose(self.i, self.j):
+            self.engine.reveal(self.i, self.j)
+            is_changed = True
+        elif self.check_chord(self.i, self.j):
+            # All the neighbours and their cascades open in one engine call and one screen update
+            self.engine.chord(self.i, self.j)
+            is_changed = True
+        elif self.check_set_flag(self.i, self.j):
+            self.engine.flag(self.i, self.j)
+        elif self.check_delete_flag(self.i, self.j):
+            self.engine.unflag(self.i, self.j)
+        elif (self.check_restart_button_click(self.MOUSE_X, self.MOUSE_Y,
+                                              self.BUTTON_TYPE, self.FIELD_WIDTH) or
+              self.check_menu_button_click(self.MOUSE_X, self.MOUSE_Y,
+                                           self.BUTTON_TYPE, self.FIELD_WIDTH) or
+              self.check_exit_button_click(self.MOUSE_X, self.MOUSE_Y,
+                                           self.BUTTON_TYPE, self.FIELD_HEIGHT,
+                                           self.FIELD_WIDTH)):
+            is_confirmed = True
+            self.xtemp, self.ytemp = self.MOUSE_X, self.MOUSE_Y
 
-            # Check game end conditions
-            if is_confirmed:
-                result = self.check_buttons_click()
-                if result:
-                    return result
-            elif self.fcount == self.FIELD_WIDTH * self.FIELD_HEIGHT - self.FIELD_MINES_COUNT:
+        self.IS_MOUSE_DOWN = False
+        self.draw_clock()
+        self.display.flush()
+
+        # Game end conditions only change after an action
+        if is_confirmed:
+            return self.check_buttons_click()
+        elif is_changed:
+            if self.engine.status == STATUS_WON:
                 return self.display_win()
-            elif self.check_is_lose(self.i, self.j):
+            elif self.engine.status == STATUS_LOST:
                 return self.display_lose()
-
-            pygame.time.delay(1)
+        return None
 
     def main(self):
         """Main game loop"""
         result = self.display_game_step()
-        if result == "MenuMainStep":
-            return result
-        pygame.quit()
\ No newline at end of file
+        if self.replay is not None:
+            self.replay.close()
+        if self.huge:
+            # Chunks spilled to disk are not needed after the game
+            self.FIELD.close()
+        if DEBUG_MODE:
+            print(f"Idle CPU: {self.idle_cpu_percent():.1f}%")
+            print(Fonts.get_fonts().report())
+        # The window stays open for the menu or the next game, "Exit" has already quit pygame
+        return result
+
+    def reset(self, seed=None):
+        """Prepare a new game on the same field and engine; the board is cleared in place by draw_field"""
+        if self.huge:
+            self.engine.seed = seed or random_seed()
+        else:
+            pregen = Pregen.get_pregenerator()
+            seed, candidate = pregen.take(self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT, seed)
+            pregen.prepare(self.FIELD_WIDTH, self.FIELD_HEIGHT, self.FIELD_MINES_COUNT)
+            self.engine.seed = seed
+            self.engine.use_candidate(seed, candidate)
+
+
+class GameSession:
+    """Consecutive games in one window
+
+    Restarting keeps the GameLogic with its engine, board and fonts and only
+    resets the board in place; a new GameLogic is made when the field
+    settings change. Restarts loop here instead of recursing.
+    """
+
+    def __init__(self):
+        self.logic = None
+        self.config = None
+
+    def play(self, width, height, mines, seed=None, no_guess=False):
+        """Play until the player leaves the game field, returns the next program step"""
+        config = (width, height, mines, no_guess)
+        if self.logic is None or config != self.config:
+            self.logic = GameLogic(width, height, mines, seed, no_guess)
+            self.config = config
+        else:
+            self.logic.reset(seed)
+        while True:
+            result = self.logic.main()
+            if result != "Restart":
+                return result
+            # A restart deals the same seed again if the player chose one
+            self.logic.reset(seed)
\ No newline at end of file
@@ -16,6 +16,19 @@ BACKGROUND_SRC = 'background.png'
 BACKGROUND_WIDTH = 600
 BACKGROUND_HEIGHT = 400
 
+# Уровни сложности
+LEVELS = {
+    0: {"name": "Легкий", "width": 8, "height": 8, "mines": 10},
+    1: {"name": "Нормальный", "width": 16, "height": 16, "mines": 40},
+    2: {"name": "Сложный", "width": 30, "height": 19, "mines": 70}
+}
+
+# Наибольшая сторона пользовательского поля
+MAX_FIELD_SIDE = 100000
+
+# Поля больше этого числа клеток строятся кусками по требованию (InfiniteBoard)
+HUGE_BOARD_CELLS = 4000000
+
 # Дополнительные константы, которые могут понадобиться
 class Colors:
     """Цвета для игры"""
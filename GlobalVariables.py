@@ -35,7 +35,7 @@ class GameState:
         # Состояние мыши
         self.is_mouse_down: bool = False
         self.mouse_pos: Tuple[int, int] = (0, 0)
-        self.mouse_button: int = 0  # 1-левая, 2-правая, 3-средняя
+        self.mouse_button: int = 0  # 1-левая, 2-средняя, 3-правая
 
         # Пользовательский ввод
         self.is_user_input_done: bool = False
@@ -0,0 +1,310 @@
+import math
+import os
+import shutil
+import tempfile
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from Board import MINE, OPENED, FLAG, NEIGHBOURS
+from GameEngine import GameEngine, STATUS_PLAYING, random_seed
+
+# Сторона куска поля в клетках
+CHUNK_SIZE = 64
+# Сколько кусков держать в памяти (по 8 КБ на кусок)
+MAX_CHUNKS = 512
+# При меньшей плотности пустые области перестают быть конечными
+# (пустая клетка встречается чаще порога протекания) и каскад уходит в бесконечность
+MIN_DENSITY = 0.12
+
+
+def min_mines(width: int, height: int) -> int:
+    """Наименьшее число мин, при котором огромное поле строится с заданной плотностью"""
+    return math.ceil(MIN_DENSITY * width * height)
+
+
+class Chunk:
+    """Материализованный кусок поля: состояние клеток и числа мин вокруг"""
+
+    __slots__ = ("state", "nearby", "dirty")
+
+    def __init__(self, state: np.ndarray, nearby: np.ndarray):
+        self.state = state
+        self.nearby = nearby
+        self.dirty = False  # есть открытые клетки или флаги, которые надо сохранить
+
+
+class ChunkLayer:
+    """Доступ к слою по [i, j], как к массивам Board, например для Solver"""
+
+    def __init__(self, board: "InfiniteBoard", name: str):
+        self.board = board
+        self.name = name
+
+    def __getitem__(self, cell: tuple):
+        chunk, li, lj = self.board.locate(*cell)
+        return getattr(chunk, self.name)[li, lj]
+
+
+class InfiniteBoard:
+    """Огромное поле из лениво создаваемых кусков
+
+    Мины куска однозначно получаются из (зерно, координаты куска), поэтому
+    кусок строится только тогда, когда его касается ход или отрисовка.
+    Построенные куски хранятся в LRU; вытесняемый кусок с открытыми
+    клетками или флагами сбрасывается на диск и при следующем обращении
+    восстанавливается поверх заново сгенерированных мин. Память ограничена
+    MAX_CHUNKS кусками независимо от размеров поля.
+
+    Интерфейс клеток повторяет Board (индексы с 1), так что поле работает с
+    GameEngine и Solver. Общего числа мин поле не знает - плотность задана
+    вероятностью мины в клетке.
+    """
+
+    def __init__(self, width: int, height: int, density: float, seed: int, directory: str = None):
+        if not MIN_DENSITY <= density < 1:
+            raise ValueError(f"Плотность мин должна быть от {MIN_DENSITY} до 1")
+        self.width = width
+        self.height = height
+        self.density = density
+        self.seed = seed
+        self.directory = directory  # куда сбрасывать куски, None - временный каталог
+        self._own_directory = directory is None
+        self.chunks = OrderedDict()  # (cx, cy) -> Chunk, от давних к недавним
+        self.spilled = set()  # куски, сохраненные на диск
+        self.cleared = set()  # клетки, из которых убраны мины первым ходом
+        self.opened_count = 0
+        self._flags_count = 0
+        self._last = None  # последний кусок: соседние клетки обычно в нем же
+        self.state = ChunkLayer(self, "state")
+        self.nearby = ChunkLayer(self, "nearby")
+
+    # Куски
+
+    def _chunk_mines(self, cx: int, cy: int) -> np.ndarray:
+        """Мины куска по зерну и его координатам, без обращения к другим кускам"""
+        size = CHUNK_SIZE
+        if cx < 0 or cy < 0 or cx * size >= self.width or cy * size >= self.height:
+            return np.zeros((size, size), dtype=bool)
+        rng = np.random.default_rng([self.seed, cx, cy])
+        mines = rng.random((size, size)) < self.density
+        # Клетки за краем поля
+        mines[max(0, self.width - cx * size):, :] = False
+        mines[:, max(0, self.height - cy * size):] = False
+        for i, j in self.cleared:
+            if (i - 1) // size == cx and (j - 1) // size == cy:
+                mines[(i - 1) % size, (j - 1) % size] = False
+        return mines
+
+    def _materialize(self, cx: int, cy: int) -> Chunk:
+        size = CHUNK_SIZE
+        # Мины куска с рамкой из краев соседних кусков
+        padded = np.zeros((size + 2, size + 2), dtype=np.uint8)
+        parts = {-1: (slice(0, 1), slice(size - 1, size)), 0: (slice(1, size + 1), slice(None)),
+                 1: (slice(size + 1, size + 2), slice(0, 1))}
+        for dx, (target_x, source_x) in parts.items():
+            for dy, (target_y, source_y) in parts.items():
+                padded[target_x, target_y] = self._chunk_mines(cx + dx, cy + dy)[source_x, source_y]
+
+        nearby = np.zeros((size, size), dtype=np.uint8)
+        for di, dj in NEIGHBOURS:
+            nearby += padded[1 + di:size + 1 + di, 1 + dj:size + 1 + dj]
+        mines = padded[1:-1, 1:-1]
+        nearby[mines != 0] = 0
+
+        state = mines * np.uint8(MINE)
+        if (cx, cy) in self.spilled:
+            state |= np.load(self._chunk_path(cx, cy))
+        return Chunk(state, nearby)
+
+    def _chunk_path(self, cx: int, cy: int) -> str:
+        return os.path.join(self.directory, f"{cx}_{cy}.npy")
+
+    def _spill(self, key: tuple, chunk: Chunk):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix="minesweeper-chunks-")
+        os.makedirs(self.directory, exist_ok=True)
+        np.save(self._chunk_path(*key), chunk.state & (OPENED | FLAG))
+        self.spilled.add(key)
+
+    def chunk(self, cx: int, cy: int) -> Chunk:
+        """Кусок с координатами (cx, cy), при необходимости построенный или загруженный"""
+        key = (cx, cy)
+        if self._last is not None and self._last[0] == key:
+            return self._last[1]
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self._materialize(cx, cy)
+            while len(self.chunks) > MAX_CHUNKS:
+                old_key, old_chunk = self.chunks.popitem(last=False)
+                if old_chunk.dirty:
+                    self._spill(old_key, old_chunk)
+        else:
+            self.chunks.move_to_end(key)
+        self._last = (key, chunk)
+        return chunk
+
+    def locate(self, i: int, j: int) -> tuple:
+        """(кусок, i внутри куска, j внутри куска) для клетки поля"""
+        cx, li = divmod(i - 1, CHUNK_SIZE)
+        cy, lj = divmod(j - 1, CHUNK_SIZE)
+        return self.chunk(cx, cy), li, lj
+
+    # Клетки
+
+    def inside(self, i: int, j: int) -> bool:
+        return 1 <= i <= self.width and 1 <= j <= self.height
+
+    def _cell_state(self, i: int, j: int) -> int:
+        chunk, li, lj = self.locate(i, j)
+        return chunk.state[li, lj]
+
+    def is_mine(self, i: int, j: int) -> bool:
+        return bool(self._cell_state(i, j) & MINE)
+
+    def is_opened(self, i: int, j: int) -> bool:
+        return bool(self._cell_state(i, j) & OPENED)
+
+    def is_flag(self, i: int, j: int) -> bool:
+        return bool(self._cell_state(i, j) & FLAG)
+
+    def nearby_mines(self, i: int, j: int) -> int:
+        chunk, li, lj = self.locate(i, j)
+        return int(chunk.nearby[li, lj])
+
+    def open(self, i: int, j: int) -> bool:
+        chunk, li, lj = self.locate(i, j)
+        if chunk.state[li, lj] & OPENED:
+            return False
+        chunk.state[li, lj] |= OPENED
+        chunk.dirty = True
+        self.opened_count += 1
+        return True
+
+    def set_flag(self, i: int, j: int):
+        chunk, li, lj = self.locate(i, j)
+        if not chunk.state[li, lj] & FLAG:
+            chunk.state[li, lj] |= FLAG
+            chunk.dirty = True
+            self._flags_count += 1
+
+    def delete_flag(self, i: int, j: int):
+        chunk, li, lj = self.locate(i, j)
+        if chunk.state[li, lj] & FLAG:
+            chunk.state[li, lj] &= ~FLAG & 0xFF
+            chunk.dirty = True
+            self._flags_count -= 1
+
+    def flags_count(self) -> int:
+        return self._flags_count
+
+    def window(self, i0: int, i1: int, j0: int, j1: int) -> tuple:
+        """Состояние и числа клеток прямоугольника [i0, i1] x [j0, j1], собранные из кусков"""
+        state = np.zeros((i1 - i0 + 1, j1 - j0 + 1), dtype=np.uint8)
+        nearby = np.zeros_like(state)
+        for cx in range((i0 - 1) // CHUNK_SIZE, (i1 - 1) // CHUNK_SIZE + 1):
+            for cy in range((j0 - 1) // CHUNK_SIZE, (j1 - 1) // CHUNK_SIZE + 1):
+                chunk = self.chunk(cx, cy)
+                # Пересечение куска с прямоугольником в координатах поля
+                a0, a1 = max(i0, cx * CHUNK_SIZE + 1), min(i1, (cx + 1) * CHUNK_SIZE)
+                b0, b1 = max(j0, cy * CHUNK_SIZE + 1), min(j1, (cy + 1) * CHUNK_SIZE)
+                source = (slice(a0 - 1 - cx * CHUNK_SIZE, a1 - cx * CHUNK_SIZE),
+                          slice(b0 - 1 - cy * CHUNK_SIZE, b1 - cy * CHUNK_SIZE))
+                target = (slice(a0 - i0, a1 - i0 + 1), slice(b0 - j0, b1 - j0 + 1))
+                state[target] = chunk.state[source]
+                nearby[target] = chunk.nearby[source]
+        return state, nearby
+
+    def reveal(self, i: int, j: int) -> list:
+        """Открывает клетку и пустую область вокруг, как Board.reveal, но через куски"""
+        if not self.open(i, j):
+            return []
+        opened = [(i, j)]
+        if self.nearby_mines(i, j):
+            return opened
+
+        width, height = self.width, self.height
+        queue = deque(opened)
+        while queue:
+            ci, cj = queue.popleft()
+            for di, dj in NEIGHBOURS:
+                ni, nj = ci + di, cj + dj
+                if not (1 <= ni <= width and 1 <= nj <= height):
+                    continue
+                chunk, li, lj = self.locate(ni, nj)
+                if chunk.state[li, lj] & (OPENED | FLAG):
+                    continue
+                chunk.state[li, lj] |= OPENED
+                chunk.dirty = True
+                opened.append((ni, nj))
+                if not chunk.nearby[li, lj]:
+                    queue.append((ni, nj))
+
+        self.opened_count += len(opened) - 1
+        return opened
+
+    def safe_zone(self, i: int, j: int, mines: int = 0) -> list:
+        return [(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if self.inside(i + di, j + dj)]
+
+    def clear_zone(self, excluded, rng=None) -> int:
+        """Первый ход: убрать мины из безопасной зоны
+
+        Вызывается до первого открытия, поэтому построенные куски просто
+        отбрасываются и строятся заново уже без этих мин. Возвращает
+        ожидаемое число мин на поле.
+        """
+        self.cleared.update(cell for cell in excluded if self.inside(*cell))
+        self.chunks.clear()
+        self._last = None
+        return self.expected_mines()
+
+    def expected_mines(self) -> int:
+        return round(self.density * self.width * self.height)
+
+    def memory_chunks(self) -> int:
+        return len(self.chunks)
+
+    def reset(self):
+        self.chunks.clear()
+        self._last = None
+        for key in self.spilled:
+            os.remove(self._chunk_path(*key))
+        self.spilled.clear()
+        self.cleared.clear()
+        self.opened_count = 0
+        self._flags_count = 0
+
+    def close(self):
+        """Удаление сброшенных на диск кусков"""
+        self.reset()
+        if self._own_directory and self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+
+class InfiniteEngine(GameEngine):
+    """Правила для огромного поля из кусков
+
+    Побед нет - поле слишком велико, чтобы его пройти, результат партии
+    определяет число открытых клеток. Число мин - ожидаемое по плотности.
+    """
+
+    def __init__(self, width: int, height: int, density: float, seed: int = None):
+        self.density = density
+        super().__init__(width, height, round(density * width * height), True, seed)
+
+    def _create_board(self):
+        return InfiniteBoard(self.width, self.height, self.density, self.seed)
+
+    def new_board(self, seed: int = None):
+        self.board.seed = seed = seed or random_seed()
+        super().new_board(seed)
+
+    def _generate(self, i: int, j: int):
+        excluded = self.board.safe_zone(i, j) if self.safe_zone else [(i, j)]
+        self.board.clear_zone(excluded)
+        self.status = STATUS_PLAYING
+        self._emit("on_board_generated")
+
+    def is_cleared(self) -> bool:
+        return False
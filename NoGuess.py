@@ -0,0 +1,227 @@
+import argparse
+import concurrent.futures
+import os
+import random
+import sys
+import threading
+import time
+
+from GameEngine import GameEngine, GENERATOR, STATUS_WON, random_seed
+from GlobalConstants import LEVELS
+from Solver import Solver
+
+# Пул проверенных полей хранится как зерна: поле однозначно задается
+# зерном и первым ходом, поэтому повторы таких партий тоже воспроизводимы.
+POOL_DIR = "noguess"
+# Сколько зерен держать на диске для одной конфигурации
+POOL_SIZE = 32
+# Пополнять пул, когда в нем осталось меньше зерен
+LOW_WATER = 8
+# Сколько зерен ищет одна задача рабочего процесса
+BATCH = 8
+# Сколько зерен перебирает одна задача, прежде чем сдаться
+ATTEMPTS = 5000
+# Сколько ждать поиска на первом ходе, если пул пуст
+FIRST_CLICK_TIMEOUT = 0.3
+
+
+def is_no_guess(width: int, height: int, mines: int, seed: int, first: tuple,
+                safe_zone: bool = True) -> bool:
+    """Проходится ли поле решателем от первого хода до победы без угадывания"""
+    engine = GameEngine(width, height, mines, safe_zone, seed)
+    solver = Solver(engine.board)
+    engine.subscribe(solver)
+    engine.reveal(*first)
+    while not engine.is_over():
+        safe = solver.next_safe()
+        if not safe:
+            return False
+        for i, j in safe:
+            engine.reveal(i, j)
+    return engine.status == STATUS_WON
+
+
+def find_seeds(config: tuple, count: int, start: int, attempts: int = ATTEMPTS,
+               deadline: float = None) -> list:
+    """Поиск до count зерен без угадывания для конфигурации (ш, в, мины, i, j, зона)
+
+    Выполняется в рабочем процессе, поэтому принимает только простые значения.
+    """
+    width, height, mines, i, j, safe_zone = config
+    rng = random.Random(start)
+    seeds = []
+    for _ in range(attempts):
+        seed = rng.randrange(1, 1000000000)
+        if is_no_guess(width, height, mines, seed, (i, j), safe_zone):
+            seeds.append(seed)
+            if len(seeds) == count:
+                break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return seeds
+
+
+class NoGuessPool:
+    """Пул полей без угадывания на диске, пополняемый пулом процессов
+
+    На каждую конфигурацию (размеры, мины, клетка первого хода, безопасная
+    зона) хранится файл с зернами, не более POOL_SIZE штук. Выдача зерна
+    мгновенная; когда зерен становится меньше LOW_WATER, в фоне
+    запускается поиск новых.
+    """
+
+    def __init__(self, directory: str = POOL_DIR, size: int = POOL_SIZE, workers: int = None):
+        self.directory = directory
+        self.size = size
+        self.workers = workers
+        self.executor = None
+        self.pending = {}  # конфигурация -> задача поиска
+        self.closed = False  # после close новые поиски не запускаются
+        # Результаты задач приходят в служебном потоке пула
+        self.lock = threading.RLock()
+
+    def _path(self, config: tuple) -> str:
+        width, height, mines, i, j, safe_zone = config
+        # Зерна действительны только для своей версии генератора поля
+        name = f"{width}x{height}x{mines}-{i}-{j}{'' if safe_zone else '-nozone'}-g{GENERATOR}.txt"
+        return os.path.join(self.directory, name)
+
+    def _load(self, config: tuple) -> list:
+        try:
+            with open(self._path(config), "r", encoding="utf-8") as f:
+                return [int(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return []
+
+    def _save(self, config: tuple, seeds: list):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(config)
+        # Запись через временный файл, чтобы не оставить обрезанный пул
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("".join(f"{seed}\n" for seed in seeds[:self.size]))
+        os.replace(path + ".tmp", path)
+
+    def available(self, config: tuple) -> int:
+        with self.lock:
+            return len(self._load(config))
+
+    def take(self, config: tuple):
+        """Зерно из пула или None, если пул пуст; при нехватке запускает пополнение"""
+        with self.lock:
+            seeds = self._load(config)
+            seed = seeds.pop(0) if seeds else None
+            if seed is not None:
+                self._save(config, seeds)
+            if len(seeds) < LOW_WATER:
+                self._refill(config)
+        return seed
+
+    def refill(self, config: tuple):
+        with self.lock:
+            if len(self._load(config)) < self.size:
+                self._refill(config)
+
+    def _refill(self, config: tuple):
+        if self.closed or config in self.pending:
+            return
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+        future = self.executor.submit(find_seeds, config, BATCH, random_seed())
+        self.pending[config] = future
+        future.add_done_callback(lambda done: self._store(config, done))
+
+    def _store(self, config: tuple, future):
+        with self.lock:
+            del self.pending[config]
+            if future.cancelled() or future.exception() is not None:
+                return
+            seeds = self._load(config) + future.result()
+            self._save(config, seeds)
+            # Пустой результат значит, что такие поля почти не встречаются - не зацикливаемся
+            if future.result() and len(seeds) < self.size:
+                self._refill(config)
+
+    def wait(self):
+        """Ожидание всех запущенных пополнений"""
+        while True:
+            with self.lock:
+                futures = list(self.pending.values())
+            if not futures:
+                return
+            concurrent.futures.wait(futures)
+
+    def first_click_seed(self, width: int, height: int, mines: int, i: int, j: int,
+                         safe_zone: bool = True, timeout: float = FIRST_CLICK_TIMEOUT):
+        """Зерно поля без угадывания для первого хода в (i, j)
+
+        Если пул этой клетки пуст, поиск идет прямо здесь не дольше timeout
+        секунд; None означает, что подходящего поля не нашлось.
+        """
+        config = (width, height, mines, i, j, safe_zone)
+        seed = self.take(config)
+        if seed is None:
+            seeds = find_seeds(config, 1, random_seed(), deadline=time.perf_counter() + timeout)
+            seed = seeds[0] if seeds else None
+        return seed
+
+    def close(self):
+        """Остановка поиска: задачи отменяются, новые не запускаются"""
+        with self.lock:
+            self.closed = True
+            executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        # Запущенная задача перебирает до ATTEMPTS полей, и выход процесса ждал бы ее.
+        # Рабочие процессы ничего не пишут сами, поэтому их можно просто остановить
+        # (в Python 3.14 для этого есть terminate_workers)
+        terminate = getattr(executor, "terminate_workers", None)
+        if terminate is not None:
+            terminate()
+            return
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+
+_pool = None
+
+
+def get_pool() -> NoGuessPool:
+    """Общий пул на все партии процесса"""
+    global _pool
+    if _pool is None:
+        _pool = NoGuessPool()
+    return _pool
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Заполнение пула полей без угадывания")
+    parser.add_argument("--levels", type=int, nargs="*", default=list(LEVELS), choices=list(LEVELS))
+    parser.add_argument("--all-cells", action="store_true",
+                        help="заполнить пул для каждой клетки первого хода, а не только для центра")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    pool = NoGuessPool(workers=args.workers)
+    start = time.perf_counter()
+    configs = []
+    for level in args.levels:
+        width, height, mines = LEVELS[level]["width"], LEVELS[level]["height"], LEVELS[level]["mines"]
+        if args.all_cells:
+            cells = [(i, j) for i in range(1, width + 1) for j in range(1, height + 1)]
+        else:
+            cells = [((width + 1) // 2, (height + 1) // 2)]
+        configs += [(width, height, mines, i, j, True) for i, j in cells]
+
+    for config in configs:
+        pool.refill(config)
+    pool.wait()
+    pool.close()
+
+    total = sum(pool.available(config) for config in configs)
+    print(f"Конфигураций: {len(configs)}, зерен в пуле: {total}, {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import concurrent.futures
+
+from GameEngine import candidate_board, random_seed
+from GlobalConstants import LEVELS
+
+# Сколько подготовленных полей держать одновременно
+MAX_PREPARED = 8
+
+
+class Pregenerator:
+    """Подготовка полей-кандидатов в фоновом потоке
+
+    Кандидат (мины по зерну, числа и индекс пустых областей) не зависит от
+    первого хода, поэтому его можно построить, пока игрок смотрит меню.
+    На первом ходе движку остается только убрать мины из безопасной зоны.
+    Вызывается только из основного потока, поток-исполнитель один.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.prepared = []  # [(ширина, высота, мины, зерно, задача)] от старых к новым
+
+    def prepare(self, width: int, height: int, mines: int, seed: int = None) -> int:
+        """Запуск подготовки поля, возвращает его зерно"""
+        seed = seed or random_seed()
+        if any(entry[:4] == (width, height, mines, seed) for entry in self.prepared):
+            return seed
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="pregen")
+        future = self.executor.submit(candidate_board, width, height, mines, seed)
+        self.prepared.append((width, height, mines, seed, future))
+        while len(self.prepared) > MAX_PREPARED:
+            self.prepared.pop(0)[4].cancel()
+        return seed
+
+    def prepare_levels(self):
+        """По одному полю на каждый стандартный уровень, пока открыто меню уровней"""
+        for level in LEVELS.values():
+            config = (level["width"], level["height"], level["mines"])
+            if not any(entry[:3] == config for entry in self.prepared):
+                self.prepare(*config)
+
+    def take(self, width: int, height: int, mines: int, seed: int = None) -> tuple:
+        """(зерно, задача) подготовленного поля; если его нет, подготовка запускается сейчас
+
+        Без зерна подходит любое поле с такими размерами и числом мин.
+        """
+        for index, entry in enumerate(self.prepared):
+            if entry[:3] == (width, height, mines) and (seed is None or entry[3] == seed):
+                del self.prepared[index]
+                return entry[3], entry[4]
+        seed = self.prepare(width, height, mines, seed)
+        return seed, self.prepared.pop()[4]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+_pregenerator = None
+
+
+def get_pregenerator() -> Pregenerator:
+    """Общий подготовитель полей на все партии процесса"""
+    global _pregenerator
+    if _pregenerator is None:
+        _pregenerator = Pregenerator()
+    return _pregenerator
@@ -0,0 +1,270 @@
+import time
+from collections import OrderedDict
+from math import lgamma
+
+import numpy as np
+
+from Board import Board, NEIGHBOURS, OPENED
+
+# Сколько разобранных компонент фронта хранить в кэше
+CACHE_SIZE = 4096
+# Компоненты крупнее этого не перебираются, а оцениваются приближенно
+MAX_COMPONENT = 400
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class ProbabilityResult:
+    """Вероятности мин в закрытых клетках"""
+
+    def __init__(self, probabilities: dict, interior: float, exact: bool, elapsed: float):
+        self.probabilities = probabilities  # клетка -> вероятность мины
+        self.interior = interior  # вероятность для клеток вне фронта
+        self.exact = exact  # False, если часть фронта оценена приближенно
+        self.elapsed = elapsed
+
+    def probability(self, cell: tuple) -> float:
+        return self.probabilities.get(cell, self.interior)
+
+    def best_guess(self, cells) -> tuple:
+        """Клетка с наименьшей вероятностью мины"""
+        return min(cells, key=self.probability)
+
+
+class ProbabilityEngine:
+    """Точные вероятности мин по видимой части поля
+
+    Фронт (закрытые клетки рядом с открытыми числами) делится на независимые
+    компоненты, каждая перебирается с возвратом, а результаты перебора
+    кэшируются по сигнатуре ограничений. Компоненты и клетки вне фронта
+    объединяются с весами по биномиальным коэффициентам от общего числа мин.
+    Если перебор не укладывается в бюджет времени, оставшиеся компоненты
+    оцениваются приближенно и результат помечается как неточный.
+    """
+
+    def __init__(self, board: Board, mines: int):
+        self.board = board
+        self.mines = mines
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+
+    def _neighbours(self, i: int, j: int):
+        board = self.board
+        for di, dj in NEIGHBOURS:
+            if board.inside(i + di, j + dj):
+                yield i + di, j + dj
+
+    def _constraints(self) -> list:
+        """Ограничения открытых чисел: (закрытые соседи, число мин)"""
+        board = self.board
+        state = board.state
+        constraints = []
+        for i, j in zip(*(board.nearby[1:-1, 1:-1] * ((state[1:-1, 1:-1] & OPENED) != 0)).nonzero()):
+            cell = (int(i) + 1, int(j) + 1)
+            closed = tuple(sorted(n for n in self._neighbours(*cell) if not state[n] & OPENED))
+            if closed:
+                constraints.append((closed, int(board.nearby[cell])))
+        return constraints
+
+    @staticmethod
+    def _components(constraints: list) -> list:
+        """Разбиение ограничений на независимые компоненты"""
+        parent = {}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for cells, _ in constraints:
+            for cell in cells:
+                parent.setdefault(cell, cell)
+            root = find(cells[0])
+            for cell in cells[1:]:
+                other = find(cell)
+                if other != root:
+                    parent[other] = root
+
+        groups = {}
+        for constraint in constraints:
+            groups.setdefault(find(constraint[0][0]), []).append(constraint)
+        return list(groups.values())
+
+    def compute(self, time_budget: float = 0.1) -> ProbabilityResult:
+        start = time.perf_counter()
+        deadline = start + time_budget
+        board = self.board
+
+        closed_count = board.width * board.height - board.opened_count
+        components = self._components(self._constraints())
+
+        # Для каждой компоненты: клетки и распределение {мин: (решений, [мин в клетке])}
+        solved = []
+        exact = True
+        for constraints in components:
+            cells = sorted({cell for members, _ in constraints for cell in members})
+            try:
+                if len(cells) > MAX_COMPONENT or time.perf_counter() > deadline:
+                    raise BudgetExceeded()
+                distribution = self._solve_component(cells, constraints, deadline)
+            except BudgetExceeded:
+                exact = False
+                distribution = self._approximate(cells, constraints)
+            solved.append((cells, distribution))
+
+        frontier_count = sum(len(cells) for cells, _ in solved)
+        interior_count = closed_count - frontier_count
+
+        # Веса компонент по числу мин, нормированные к сумме 1, чтобы
+        # произведения по многим компонентам не выходили за пределы float
+        totals = []
+        per_cell = []
+        for cells, distribution in solved:
+            size = max(distribution) + 1
+            total = np.zeros(size)
+            counts = np.zeros((size, len(cells)))
+            for k, (ways, cell_counts) in distribution.items():
+                total[k] = ways
+                counts[k] = cell_counts
+            scale = total.sum()
+            totals.append(total / scale)
+            per_cell.append(counts / scale)
+
+        # Свертки всех компонент, кроме одной, через префиксы и суффиксы
+        prefix = [np.ones(1)]
+        for total in totals:
+            prefix.append(np.convolve(prefix[-1], total))
+        suffix = [np.ones(1)]
+        for total in reversed(totals):
+            suffix.append(np.convolve(suffix[-1], total))
+        suffix.reverse()
+
+        # Число способов расставить остальные мины вне фронта при t минах на фронте,
+        # в логарифмах и относительно максимума
+        rest = self.mines - np.arange(frontier_count + 1)
+        valid = (rest >= 0) & (rest <= interior_count)
+        log_ways = np.full(frontier_count + 1, -np.inf)
+        for t in np.flatnonzero(valid):
+            log_ways[t] = (lgamma(interior_count + 1) - lgamma(rest[t] + 1) -
+                           lgamma(interior_count - rest[t] + 1))
+
+        everything = prefix[-1]
+        if valid.any():
+            interior_ways = np.exp(log_ways - log_ways.max())
+            weight = float(np.dot(everything, interior_ways[:len(everything)]))
+        else:
+            weight = 0.0
+        if weight <= 0.0:
+            # Видимая картина (или ее приближенная оценка) противоречит числу мин,
+            # возвращаем равномерную оценку
+            uniform = self.mines / max(1, closed_count)
+            return ProbabilityResult({cell: uniform for cells, _ in solved for cell in cells},
+                                     uniform, False, time.perf_counter() - start)
+
+        probabilities = {}
+        for index, (cells, _) in enumerate(solved):
+            others = np.convolve(prefix[index], suffix[index + 1])
+            factors = np.array([np.dot(others, interior_ways[k:k + len(others)])
+                                for k in range(len(totals[index]))])
+            for cell, cell_weight in zip(cells, factors @ per_cell[index]):
+                probabilities[cell] = float(cell_weight / weight)
+
+        interior = 0.0
+        if interior_count:
+            # Доля расстановок с миной в конкретной клетке вне фронта: (M - t) / I
+            share = np.clip(rest[:len(everything)], 0, None) / interior_count
+            interior = float(np.dot(everything, interior_ways[:len(everything)] * share) / weight)
+
+        return ProbabilityResult(probabilities, interior, exact, time.perf_counter() - start)
+
+    def _solve_component(self, cells: list, constraints: list, deadline: float) -> dict:
+        index = {cell: position for position, cell in enumerate(cells)}
+        local = sorted((tuple(index[cell] for cell in members), needed) for members, needed in constraints)
+        signature = (len(cells), tuple(local))
+
+        distribution = self.cache.get(signature)
+        if distribution is not None:
+            self.cache.move_to_end(signature)
+            self.cache_hits += 1
+            return distribution
+
+        distribution = self._enumerate(len(cells), local, deadline)
+        self.cache[signature] = distribution
+        if len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return distribution
+
+    @staticmethod
+    def _enumerate(size: int, constraints: list, deadline: float) -> dict:
+        """Перебор с возвратом всех расстановок мин в компоненте"""
+        cell_constraints = [[] for _ in range(size)]
+        for number, (members, _) in enumerate(constraints):
+            for member in members:
+                cell_constraints[member].append(number)
+
+        # Порядок обхода: соседние по ограничениям клетки подряд, чтобы раньше отсекать
+        order = []
+        seen = set()
+        for members, _ in constraints:
+            for member in members:
+                if member not in seen:
+                    seen.add(member)
+                    order.append(member)
+
+        needed = [constraint[1] for constraint in constraints]
+        assigned = [0] * len(constraints)
+        remaining = [len(constraint[0]) for constraint in constraints]
+        value = [0] * size
+        distribution = {}
+        nodes = [0]
+
+        def visit(depth: int, mines: int):
+            nodes[0] += 1
+            if nodes[0] & 1023 == 0 and time.perf_counter() > deadline:
+                raise BudgetExceeded()
+            if depth == size:
+                entry = distribution.get(mines)
+                if entry is None:
+                    entry = distribution[mines] = [0, [0] * size]
+                entry[0] += 1
+                per_cell = entry[1]
+                for position in range(size):
+                    per_cell[position] += value[position]
+                return
+
+            cell = order[depth]
+            numbers = cell_constraints[cell]
+            for mine in (0, 1):
+                if all(needed[n] - assigned[n] - mine >= 0 and
+                       assigned[n] + mine + remaining[n] - 1 >= needed[n] for n in numbers):
+                    for n in numbers:
+                        assigned[n] += mine
+                        remaining[n] -= 1
+                    value[cell] = mine
+                    visit(depth + 1, mines + mine)
+                    for n in numbers:
+                        assigned[n] -= mine
+                        remaining[n] += 1
+            value[cell] = 0
+
+        visit(0, 0)
+        return {k: (entry[0], entry[1]) for k, entry in distribution.items()}
+
+    @staticmethod
+    def _approximate(cells: list, constraints: list) -> dict:
+        """Грубая оценка компоненты, не уложившейся в бюджет
+
+        Вероятность клетки - среднее плотностей ее ограничений, компонента
+        считается содержащей округленное ожидаемое число мин.
+        """
+        densities = {cell: [] for cell in cells}
+        for members, needed in constraints:
+            for member in members:
+                densities[member].append(needed / len(members))
+        probabilities = [sum(densities[cell]) / len(densities[cell]) for cell in cells]
+        expected = round(sum(probabilities))
+        # Вес 1000 позволяет сохранить дробные вероятности в целых счетчиках
+        return {expected: (1000, [round(1000 * p) for p in probabilities])}
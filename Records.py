@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+import ContentCache
+from GlobalConstants import LEVELS
+
+# База всех сыгранных партий
+RECORDS_DB = "records.db"
+# Старый файл рекордов: по паре строк имя/время на каждый стандартный уровень,
+# в кодировке системы (на Windows - cp1251). После переноса файл не удаляется
+LEGACY_FILE = "records.txt"
+# Сколько лучших результатов конфигурации считаются рекордами
+TOP_SIZE = 3
+# Подписи стандартных уровней на экране рекордов
+LEVEL_TITLES = ["Новичок", "Любитель", "Профессионал"]
+
+Record = namedtuple("Record", "name time seed finished_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    seed INTEGER,
+    time INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    name TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_top ON games (width, height, mines, won, time);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class RecordsStore:
+    """Все завершенные партии в SQLite
+
+    Каждая партия - строка с размерами поля, зерном, временем и датой,
+    поэтому рекорды есть и у пользовательских уровней. Лучшие результаты
+    конфигурации берутся по индексу (ширина, высота, мины, победа, время),
+    каждая запись - отдельная транзакция. При первом открытии в базу
+    один раз переносится старый records.txt.
+    """
+
+    def __init__(self, path: str = RECORDS_DB, legacy_path: str = LEGACY_FILE):
+        self.path = path
+        self.revision = 0  # растет с каждой записью этого процесса
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+        self._migrate(legacy_path)
+
+    def _migrate(self, legacy_path: str):
+        if self.connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone():
+            return
+        records = []
+        if os.path.exists(legacy_path):
+            try:
+                # Та же проверка кодировок, что и для правил: utf-8, затем cp1251
+                lines = [line.strip() for line in ContentCache.read_lines(legacy_path)]
+                finished_at = os.path.getmtime(legacy_path)
+            except OSError:
+                # Файл есть, но не читается: перенос повторится при следующем запуске
+                return
+            for level in range(min(len(LEVELS), len(lines) // 2)):
+                try:
+                    name, score = lines[2 * level], int(lines[2 * level + 1])
+                except ValueError:
+                    continue
+                if score > 0:
+                    config = LEVELS[level]
+                    records.append((config["width"], config["height"], config["mines"],
+                                    score, name, finished_at))
+        # Перенос и отметка о нем в одной транзакции: повторного переноса не будет
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO games (width, height, mines, seed, time, won, name, finished_at) "
+                "VALUES (?, ?, ?, NULL, ?, 1, ?, ?)", records)
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)",
+                                    (str(len(records)),))
+        self.revision += 1
+
+    def add_game(self, width: int, height: int, mines: int, seed, game_time: int, won: bool,
+                 name: str = None) -> int:
+        """Запись завершенной партии, возвращает ее номер"""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO games (width, height, mines, seed, time, won, name, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (width, height, mines, seed, game_time, int(won), name, time.time()))
+        self.revision += 1
+        return cursor.lastrowid
+
+    def set_name(self, game_id: int, name: str):
+        with self.connection:
+            self.connection.execute("UPDATE games SET name = ? WHERE id = ?", (name, game_id))
+        self.revision += 1
+
+    def is_record(self, width: int, height: int, mines: int, game_time: int, limit: int = TOP_SIZE) -> bool:
+        """Попадает ли победа за game_time секунд в limit лучших (равное время - не рекорд)"""
+        (better,) = self.connection.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM games WHERE width = ? AND height = ? AND mines = ? "
+            "AND won = 1 AND time <= ? LIMIT ?)", (width, height, mines, game_time, limit)).fetchone()
+        return better < limit
+
+    def top(self, width: int, height: int, mines: int, limit: int = TOP_SIZE) -> list:
+        """Лучшие победы конфигурации, от быстрых к медленным"""
+        rows = self.connection.execute(
+            "SELECT name, time, seed, finished_at FROM games WHERE width = ? AND height = ? AND mines = ? "
+            "AND won = 1 ORDER BY time, id LIMIT ?", (width, height, mines, limit))
+        return [Record(*row) for row in rows]
+
+    def custom_levels(self, limit: int) -> list:
+        """(ширина, высота, мины) пользовательских уровней с победами, недавние первыми"""
+        standard = {(level["width"], level["height"], level["mines"]) for level in LEVELS.values()}
+        rows = self.connection.execute(
+            "SELECT width, height, mines FROM games WHERE won = 1 "
+            "GROUP BY width, height, mines ORDER BY MAX(finished_at) DESC")
+        configs = []
+        for config in rows:
+            if config not in standard:
+                configs.append(config)
+                if len(configs) == limit:
+                    break
+        return configs
+
+    def summary(self, custom: int = 3) -> list:
+        """Строки экрана рекордов: лучший результат каждого уровня"""
+        lines = []
+        entries = [(LEVEL_TITLES[index], (level["width"], level["height"], level["mines"]))
+                   for index, level in LEVELS.items()]
+        entries += [(f"Свой {w}x{h}, {m} мин", (w, h, m)) for w, h, m in self.custom_levels(custom)]
+        for title, config in entries:
+            best = self.top(*config, limit=1)
+            if best:
+                lines.append(f"{title}: {best[0].name or 'Аноним'} {best[0].time}сек.")
+            else:
+                lines.append(f"{title}: рекорда нет")
+        return lines
+
+    def close(self):
+        self.connection.close()
+
+
+_store = None
+
+
+def get_records() -> RecordsStore:
+    """Общая база рекордов процесса"""
+    global _store
+    if _store is None:
+        _store = RecordsStore()
+    return _store
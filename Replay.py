@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+
+from GameEngine import GameEngine, GENERATOR, GENERATOR_LEGACY
+
+# Формат файла повтора:
+#   MAGIC (последняя цифра - версия генератора поля),
+#   затем varint: ширина, высота, мины, зерно и байт флагов (1 - безопасная зона);
+#   далее по одной записи на ход: varint номера клетки ((i - 1) * высота + j - 1) и байт хода.
+MAGIC = b"MSR%d" % GENERATOR
+# Сигнатуры всех поддерживаемых версий
+MAGICS = {b"MSR%d" % version: version for version in (GENERATOR_LEGACY, GENERATOR)}
+REPLAY_DIR = "replays"
+REPLAY_EXT = ".msr"
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, pos: int) -> tuple:
+    """Возвращает (значение, позиция следующего байта)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Файл повтора обрезан")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayWriter:
+    """Запись ходов движка в файл повтора
+
+    Подписывается на движок. Файл создается при первом ходе партии и
+    дописывается по одной записи на ход, после сброса поля начинается
+    новый файл.
+    """
+
+    def __init__(self, engine: GameEngine, directory: str = REPLAY_DIR):
+        self.engine = engine
+        self.directory = directory
+        self.file = None
+        self.path = None
+        engine.subscribe(self)
+
+    def _open(self):
+        engine = self.engine
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{engine.width}x{engine.height}-{engine.seed}"
+        self.path = os.path.join(self.directory, name + REPLAY_EXT)
+        # Перезапуск с тем же зерном в ту же секунду не должен дописывать чужой повтор
+        copy = 1
+        while os.path.exists(self.path):
+            copy += 1
+            self.path = os.path.join(self.directory, f"{name}-{copy}{REPLAY_EXT}")
+        self.file = open(self.path, "wb")
+        header = [encode_varint(value) for value in (engine.width, engine.height, engine.mines, engine.seed)]
+        self.file.write(b"MSR%d" % engine.generator + b"".join(header) + bytes([int(engine.safe_zone)]))
+
+    def on_move(self, action: int, i: int, j: int):
+        if self.file is None:
+            self._open()
+        self.file.write(encode_varint((i - 1) * self.engine.height + j - 1) + bytes([action]))
+        # Сбрасываем каждый ход, чтобы повтор пережил падение игры
+        self.file.flush()
+
+    def on_board_reset(self):
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_replay(path: str) -> tuple:
+    """Чтение повтора: (параметры партии, список ходов (действие, i, j))"""
+    with open(path, "rb") as f:
+        data = f.read()
+    header = {"generator": MAGICS.get(data[:len(MAGIC)])}
+    if header["generator"] is None:
+        raise ValueError(f"{path}: это не файл повтора")
+
+    pos = len(MAGIC)
+    for key in ("width", "height", "mines", "seed"):
+        header[key], pos = decode_varint(data, pos)
+    header["safe_zone"] = bool(data[pos])
+    pos += 1
+
+    moves = []
+    height = header["height"]
+    while pos < len(data):
+        index, pos = decode_varint(data, pos)
+        if pos >= len(data):
+            raise ValueError("Файл повтора обрезан")
+        moves.append((data[pos], index // height + 1, index % height + 1))
+        pos += 1
+    return header, moves
+
+
+def replay(path: str) -> GameEngine:
+    """Воспроизведение партии без графики"""
+    header, moves = read_replay(path)
+    engine = GameEngine(header["width"], header["height"], header["mines"],
+                        header["safe_zone"], header["seed"], header["generator"])
+    for action, i, j in moves:
+        engine.apply(action, i, j)
+    return engine
+
+
+def main(paths: list):
+    for path in paths:
+        start = time.perf_counter()
+        header, moves = read_replay(path)
+        engine = replay(path)
+        seconds = time.perf_counter() - start
+        print(f"{path}: {header['width']}x{header['height']}, мин {header['mines']}, "
+              f"зерно {header['seed']}, ходов {len(moves)}, итог {engine.status}, "
+              f"{seconds * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,232 @@
+import argparse
+import csv
+import multiprocessing
+import random
+import sys
+import time
+
+import numpy as np
+
+from Board import OPENED, FLAG
+from GameEngine import GameEngine, STATUS_WON
+from GlobalConstants import LEVELS
+from Probability import ProbabilityEngine
+from Solver import Solver
+
+# Объем выборки задержек на каждый тип операции
+LATENCY_SAMPLES = 100000
+
+CSV_FIELDS = ["level", "width", "height", "mines", "seed", "policy", "won", "moves", "seconds"]
+
+
+class RandomPolicy:
+    """Ход в случайную закрытую клетку без флага"""
+
+    def __init__(self, engine: GameEngine):
+        self.engine = engine
+
+    def __call__(self, rng: random.Random) -> tuple:
+        return "reveal", *self.random_closed_cell(rng)
+
+    def random_closed_cell(self, rng: random.Random, avoid=()) -> tuple:
+        board = self.engine.board
+        for _ in range(32):
+            i = rng.randint(1, board.width)
+            j = rng.randint(1, board.height)
+            if not board.state[i, j] & (OPENED | FLAG) and (i, j) not in avoid:
+                return i, j
+
+        closed = [(int(i) + 1, int(j) + 1) for i, j in
+                  np.argwhere((board.state[1:-1, 1:-1] & (OPENED | FLAG)) == 0)]
+        cells = [cell for cell in closed if cell not in avoid] or closed
+        return cells[rng.randrange(len(cells))]
+
+
+class SolverPolicy(RandomPolicy):
+    """Ходы решателя, при отсутствии выводов - случайная клетка вне известных мин"""
+
+    def __init__(self, engine: GameEngine):
+        super().__init__(engine)
+        self.solver = Solver(engine.board)
+        engine.subscribe(self.solver)
+
+    def __call__(self, rng: random.Random) -> tuple:
+        board = self.engine.board
+        if board.opened_count == 0:
+            return "reveal", (board.width + 1) // 2, (board.height + 1) // 2
+        safe = self.solver.next_safe()
+        if safe:
+            return "reveal", *safe[0]
+        return "reveal", *self.random_closed_cell(rng, self.solver.mines)
+
+
+class ProbabilityPolicy(SolverPolicy):
+    """Ходы решателя, при отсутствии выводов - клетка с наименьшей вероятностью мины"""
+
+    def __init__(self, engine: GameEngine):
+        super().__init__(engine)
+        self.probability = ProbabilityEngine(engine.board, engine.mines)
+
+    def __call__(self, rng: random.Random) -> tuple:
+        board = self.engine.board
+        if board.opened_count == 0 or self.solver.next_safe():
+            return super().__call__(rng)
+        self.probability.mines = self.engine.mines
+        result = self.probability.compute()
+        closed = [(int(i) + 1, int(j) + 1) for i, j in
+                  np.argwhere((board.state[1:-1, 1:-1] & (OPENED | FLAG)) == 0)]
+        cells = [cell for cell in closed if cell not in self.solver.mines] or closed
+        return "reveal", *result.best_guess(cells)
+
+
+# Стратегии ходов: имя -> класс, который создается на партию и по вызову
+# policy(rng) возвращает (действие, i, j)
+POLICIES = {
+    "random": RandomPolicy,
+    "solver": SolverPolicy,
+    "probability": ProbabilityPolicy,
+}
+
+
+def play_game(task: tuple) -> tuple:
+    """Одна партия в рабочем процессе
+
+    Возвращает строку для CSV и задержки операций в наносекундах.
+    """
+    level, width, height, mines, seed, policy_name = task
+    rng = random.Random(seed)
+    engine = GameEngine(width, height, mines, seed=seed)
+    policy = POLICIES[policy_name](engine)
+    actions = {"reveal": engine.reveal, "flag": engine.flag, "unflag": engine.unflag, "chord": engine.chord}
+    latencies = {}
+    moves = 0
+
+    start = time.perf_counter()
+    while not engine.is_over():
+        action, i, j = policy(rng)
+        op_start = time.perf_counter_ns()
+        actions[action](i, j)
+        latencies.setdefault(action, []).append(time.perf_counter_ns() - op_start)
+        moves += 1
+    seconds = time.perf_counter() - start
+
+    row = [level, width, height, mines, seed, policy_name, int(engine.status == STATUS_WON), moves, f"{seconds:.6f}"]
+    return row, latencies
+
+
+class LatencyStats:
+    """Задержки операции с ограниченной равномерной выборкой"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.count = 0
+        self.samples = []
+
+    def add(self, values: list):
+        for value in values:
+            self.count += 1
+            if len(self.samples) < LATENCY_SAMPLES:
+                self.samples.append(value)
+            else:
+                index = self.rng.randrange(self.count)
+                if index < LATENCY_SAMPLES:
+                    self.samples[index] = value
+
+    def percentiles(self, points=(50, 90, 99)) -> list:
+        if not self.samples:
+            return [0.0] * len(points)
+        return [value / 1000 for value in np.percentile(self.samples, points)]
+
+
+class LevelReport:
+    """Сводка по одному уровню"""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.moves = 0
+        self.seconds = 0.0
+        self.latencies = {}
+
+    def add(self, row: list, latencies: dict, rng: random.Random):
+        self.games += 1
+        self.wins += row[6]
+        self.moves += row[7]
+        self.seconds += float(row[8])
+        for action, values in latencies.items():
+            self.latencies.setdefault(action, LatencyStats(rng)).add(values)
+
+
+def parse_custom(value: str) -> tuple:
+    """Пользовательский уровень в виде ШИРИНАxВЫСОТАxМИНЫ"""
+    try:
+        width, height, mines = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается ШИРИНАxВЫСОТАxМИНЫ, получено {value!r}")
+    if width < 1 or height < 1 or not 0 < mines < width * height:
+        raise argparse.ArgumentTypeError(f"недопустимый уровень {value!r}")
+    return width, height, mines
+
+
+def make_tasks(args) -> list:
+    levels = [(LEVELS[level]["name"], LEVELS[level]["width"], LEVELS[level]["height"], LEVELS[level]["mines"])
+              for level in args.levels]
+    levels += [(f"{w}x{h}x{m}", w, h, m) for w, h, m in args.custom]
+
+    tasks = []
+    for name, width, height, mines in levels:
+        for game in range(args.games):
+            tasks.append((name, width, height, mines, args.seed + game + 1, args.policy))
+    return tasks
+
+
+def print_report(reports: dict, wall_seconds: float):
+    total_games = sum(report.games for report in reports.values())
+    total_moves = sum(report.moves for report in reports.values())
+    print(f"Всего: {total_games} партий за {wall_seconds:.2f} с, "
+          f"{total_games / wall_seconds:.1f} партий/с, {total_moves / wall_seconds:.1f} ходов/с")
+
+    for name, report in reports.items():
+        print(f"\n{name}: партий {report.games}, побед {100 * report.wins / report.games:.2f}%, "
+              f"ходов/с в процессе {report.moves / report.seconds:.1f}")
+        for action, stats in sorted(report.latencies.items()):
+            p50, p90, p99 = stats.percentiles()
+            print(f"  {action:>7}: {stats.count} операций, p50 {p50:.1f} мкс, p90 {p90:.1f} мкс, p99 {p99:.1f} мкс")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетное моделирование партий без графики")
+    parser.add_argument("--games", type=int, default=1000, help="партий на каждый уровень")
+    parser.add_argument("--levels", type=int, nargs="*", default=list(LEVELS), choices=list(LEVELS),
+                        help="стандартные уровни из LEVELS")
+    parser.add_argument("--custom", type=parse_custom, nargs="*", default=[], metavar="WxHxM",
+                        help="пользовательские уровни")
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES))
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="зерно первой партии")
+    parser.add_argument("--csv", default="simulation.csv", help="файл с результатами партий")
+    args = parser.parse_args(argv)
+
+    tasks = make_tasks(args)
+    if not tasks:
+        parser.error("не выбрано ни одного уровня")
+
+    rng = random.Random(args.seed)
+    reports = {}
+    start = time.perf_counter()
+
+    with open(args.csv, "w", newline="", encoding="utf-8") as f, \
+            multiprocessing.Pool(args.workers) as pool:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        chunksize = max(1, min(256, len(tasks) // (args.workers * 8)))
+        # Результаты пишутся по мере готовности, порядок партий не важен
+        for row, latencies in pool.imap_unordered(play_game, tasks, chunksize):
+            writer.writerow(row)
+            reports.setdefault(row[0], LevelReport()).add(row, latencies, rng)
+
+    print_report(reports, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import time
+
+from Board import Board, NEIGHBOURS, OPENED
+
+
+class Solver:
+    """Детерминированный решатель с инкрементальным фронтом
+
+    Работает только с тем, что видит игрок: открытыми клетками и их числами.
+    Каждое открытое число задает ограничение "среди закрытых соседей ровно
+    столько-то мин". После хода пересматриваются только ограничения, которых
+    коснулись открытые клетки (и выведенные из них факты), поэтому стоимость
+    хода не зависит от размера поля.
+
+    Правила: одиночное (все соседи мины или все безопасны) и правило
+    подмножества для пар ограничений с общими клетками. Флаги игрока не
+    учитываются - решатель доверяет только своим выводам.
+    """
+
+    def __init__(self, board: Board):
+        self.board = board
+        self.safe = set()  # безопасные, но еще закрытые клетки
+        self.mines = set()  # клетки, где мина стоит наверняка
+        self.dirty = set()  # числа, ограничения которых надо пересмотреть
+        self.frontier = set()  # числа, у которых остались неизвестные соседи
+        self.last_timing = 0.0
+        self.total_time = 0.0
+        self.calls = 0
+
+    # События движка
+
+    def on_board_reset(self):
+        self.safe.clear()
+        self.mines.clear()
+        self.dirty.clear()
+        self.frontier.clear()
+
+    def on_cells_opened(self, cells: list):
+        board = self.board
+        for i, j in cells:
+            self.safe.discard((i, j))
+            if board.nearby[i, j]:
+                self.dirty.add((i, j))
+            # Число соседа потеряло одну неизвестную клетку
+            for ni, nj in self._neighbours(i, j):
+                if (ni, nj) in self.frontier:
+                    self.dirty.add((ni, nj))
+
+    # Запросы
+
+    def next_safe(self) -> list:
+        """Закрытые клетки, в которых мины точно нет"""
+        self._timed_update()
+        return sorted(self.safe)
+
+    def certain_mines(self) -> list:
+        """Закрытые клетки, в которых мина стоит наверняка"""
+        self._timed_update()
+        return sorted(self.mines)
+
+    def _timed_update(self):
+        start = time.perf_counter()
+        self.update()
+        self.last_timing = time.perf_counter() - start
+        self.total_time += self.last_timing
+        self.calls += 1
+
+    # Вывод
+
+    def _neighbours(self, i: int, j: int):
+        board = self.board
+        for di, dj in NEIGHBOURS:
+            if board.inside(i + di, j + dj):
+                yield i + di, j + dj
+
+    def constraint(self, cell: tuple) -> tuple:
+        """(неизвестные соседи, сколько мин среди них осталось)"""
+        board = self.board
+        unknown = set()
+        needed = int(board.nearby[cell])
+        for neighbour in self._neighbours(*cell):
+            if neighbour in self.mines:
+                needed -= 1
+            elif not board.state[neighbour] & OPENED and neighbour not in self.safe:
+                unknown.add(neighbour)
+        return frozenset(unknown), needed
+
+    def _learn(self, cells, is_mine: bool):
+        known = self.mines if is_mine else self.safe
+        for cell in cells:
+            if cell not in known:
+                known.add(cell)
+                # Вывод меняет ограничения всех открытых чисел рядом
+                for neighbour in self._neighbours(*cell):
+                    if neighbour in self.frontier:
+                        self.dirty.add(neighbour)
+
+    def update(self):
+        """Пересмотр ограничений, затронутых последними ходами"""
+        while self.dirty:
+            cell = self.dirty.pop()
+            unknown, needed = self.constraint(cell)
+            if not unknown:
+                self.frontier.discard(cell)
+                continue
+            self.frontier.add(cell)
+
+            if needed == 0:
+                self._learn(unknown, False)
+                continue
+            if needed == len(unknown):
+                self._learn(unknown, True)
+                continue
+
+            # Правило подмножества с числами, у которых есть общие неизвестные
+            others = set()
+            for ui, uj in unknown:
+                for neighbour in self._neighbours(ui, uj):
+                    if neighbour != cell and neighbour in self.frontier:
+                        others.add(neighbour)
+            for other in others:
+                other_unknown, other_needed = self.constraint(other)
+                if unknown < other_unknown:
+                    self._apply_subset(unknown, needed, other_unknown, other_needed)
+                elif other_unknown < unknown:
+                    self._apply_subset(other_unknown, other_needed, unknown, needed)
+                if cell in self.dirty:
+                    break
+
+    def _apply_subset(self, small: frozenset, small_needed: int, big: frozenset, big_needed: int):
+        rest = big - small
+        rest_needed = big_needed - small_needed
+        if rest_needed == 0:
+            self._learn(rest, False)
+        elif rest_needed == len(rest):
+            self._learn(rest, True)
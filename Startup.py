@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+import pygame
+
+# Переменная окружения, при которой игра выходит после первого кадра (замер запуска)
+STARTUP_BENCH_ENV = "MINESWEEPER_STARTUP_BENCH"
+# Строка, которой игра сообщает о первом кадре
+FIRST_FRAME_MARK = "first-frame"
+
+
+def init():
+    """Инициализация pygame перед открытием окна
+
+    Игре нужны только окно с событиями и шрифты, поэтому вместо pygame.init,
+    который поднимает еще звук и джойстики, инициализируется только display.
+    Шрифты подключает реестр Fonts при первом запросе, изображения грузит
+    Assets при первом экране, которому они нужны. Повторный вызов, в том
+    числе после pygame.quit, поднимает окно заново.
+    """
+    if not pygame.display.get_init():
+        pygame.display.init()
+
+
+def first_frame():
+    """Отметка первого показанного кадра; в режиме замера - выход"""
+    if os.environ.get(STARTUP_BENCH_ENV):
+        print(f"{FIRST_FRAME_MARK} {time.time():.6f}", flush=True)
+        pygame.quit()
+        sys.exit(0)
+
+
+def window(size: tuple, caption: str = None) -> pygame.Surface:
+    """Окно нужного размера: set_mode вызывается, только если размер другой"""
+    init()
+    size = (int(size[0]), int(size[1]))
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != size:
+        screen = pygame.display.set_mode(size)
+    if caption is not None:
+        pygame.display.set_caption(caption)
+    return screen
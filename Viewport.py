@@ -0,0 +1,96 @@
+import pygame
+
+from GlobalConstants import WIDTH_CELL
+
+# Доступные размеры клетки в пикселях, WIDTH_CELL - исходный масштаб
+ZOOM_LEVELS = (8, 12, 16, 24, 31, WIDTH_CELL, 50, 64, 78)
+
+
+class Viewport:
+    """Камера игрового поля
+
+    Поле рисуется в прямоугольник rect окна; камера знает, какая часть
+    поля в него попадает, переводит клетки в экранные координаты и обратно.
+    Отрисовка и проверка кликов касаются только видимых клеток, поэтому их
+    стоимость ограничена размером окна, а не поля. При исходном масштабе и
+    нулевом смещении клетка (i, j) оказывается там же, где рисовалась
+    раньше: (WIDTH_CELL * i, WIDTH_CELL * j).
+    """
+
+    def __init__(self, rect: pygame.Rect, field_width: int, field_height: int, cell: int = WIDTH_CELL):
+        self.rect = pygame.Rect(rect)
+        self.field_width = field_width
+        self.field_height = field_height
+        self.cell = cell
+        # Смещение камеры в пикселях от левого верхнего угла клетки (1, 1)
+        self.offset_x = 0
+        self.offset_y = 0
+
+    def _clamp(self):
+        max_x = max(0, self.field_width * self.cell - self.rect.width)
+        max_y = max(0, self.field_height * self.cell - self.rect.height)
+        self.offset_x = min(max(0, self.offset_x), max_x)
+        self.offset_y = min(max(0, self.offset_y), max_y)
+
+    def scrollable(self) -> bool:
+        """Не помещается ли поле в rect целиком"""
+        return (self.field_width * self.cell > self.rect.width or
+                self.field_height * self.cell > self.rect.height)
+
+    def visible_range(self) -> tuple:
+        """(i0, i1, j0, j1) - видимые клетки, включая частично видимые"""
+        i0 = self.offset_x // self.cell + 1
+        j0 = self.offset_y // self.cell + 1
+        i1 = min(self.field_width, (self.offset_x + self.rect.width - 1) // self.cell + 1)
+        j1 = min(self.field_height, (self.offset_y + self.rect.height - 1) // self.cell + 1)
+        return i0, i1, j0, j1
+
+    def is_visible(self, i: int, j: int) -> bool:
+        i0, i1, j0, j1 = self.visible_range()
+        return i0 <= i <= i1 and j0 <= j <= j1
+
+    def cell_rect(self, i: int, j: int) -> pygame.Rect:
+        """Экранный прямоугольник клетки (может выходить за rect)"""
+        return pygame.Rect(self.rect.x + (i - 1) * self.cell - self.offset_x,
+                           self.rect.y + (j - 1) * self.cell - self.offset_y,
+                           self.cell, self.cell)
+
+    def cell_at(self, x: int, y: int):
+        """Клетка под точкой экрана или None"""
+        if not self.rect.collidepoint(x, y):
+            return None
+        i = (x - self.rect.x + self.offset_x) // self.cell + 1
+        j = (y - self.rect.y + self.offset_y) // self.cell + 1
+        if 1 <= i <= self.field_width and 1 <= j <= self.field_height:
+            return i, j
+        return None
+
+    def pan(self, dx: int, dy: int) -> bool:
+        """Сдвиг камеры на (dx, dy) пикселей, возвращает True, если она сдвинулась"""
+        old = (self.offset_x, self.offset_y)
+        self.offset_x += dx
+        self.offset_y += dy
+        self._clamp()
+        return (self.offset_x, self.offset_y) != old
+
+    def zoom(self, steps: int, x: int = None, y: int = None) -> bool:
+        """Смена масштаба на steps уровней с точкой (x, y) экрана на месте"""
+        index = ZOOM_LEVELS.index(self.cell) if self.cell in ZOOM_LEVELS else ZOOM_LEVELS.index(WIDTH_CELL)
+        cell = ZOOM_LEVELS[min(max(index + steps, 0), len(ZOOM_LEVELS) - 1)]
+        if cell == self.cell:
+            return False
+        if x is None:
+            x, y = self.rect.center
+        # Точка поля под курсором остается под курсором
+        field_x = x - self.rect.x + self.offset_x
+        field_y = y - self.rect.y + self.offset_y
+        self.offset_x = field_x * cell // self.cell - (x - self.rect.x)
+        self.offset_y = field_y * cell // self.cell - (y - self.rect.y)
+        self.cell = cell
+        self._clamp()
+        return True
+
+    def center_on(self, i: int, j: int):
+        self.offset_x = (i - 1) * self.cell + self.cell // 2 - self.rect.width // 2
+        self.offset_y = (j - 1) * self.cell + self.cell // 2 - self.rect.height // 2
+        self._clamp()